@@ -3,128 +3,484 @@ Code analysis module for AI Code Reviewer
 """
 
 import ast
+import hashlib
+import mmap
 import os
-from typing import List, Dict, Any
-from dataclasses import dataclass
-from config import ConfigManager
+import re
+import sys
+import time
+from contextlib import contextmanager
+from itertools import compress, count
+from typing import List, Dict, Any, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+from dataclasses import dataclass, field
+from config import AnalysisConfig, ConfigManager
+from clike import CLIKE_EXTENSIONS, scan_structure
+from profiler import NO_PHASE
+
+# Bump whenever a check changes what it reports, so cached results are not reused
+ANALYZER_VERSION = "7"
 
-@dataclass
 class CodeIssue:
+    """One reported issue, slotted with interned strings and a lazily rendered message"""
+    __slots__ = ('line', 'issue_type', 'severity', 'template', 'args')
+    
+    def __init__(self, line: int, issue_type: str, message: Optional[str] = None, severity: Optional[str] = None,
+                 template: Optional[str] = None, args: Optional[tuple] = None):
+        if template is None and message is None:
+            raise TypeError("CodeIssue() missing required argument: 'message'")
+        if template is not None and message is not None:
+            raise TypeError("CodeIssue() takes a message or a template, not both")
+        if severity is None:
+            raise TypeError("CodeIssue() missing required argument: 'severity'")
+        self.line = line
+        self.issue_type = sys.intern(issue_type)
+        self.severity = sys.intern(severity)
+        # A plain message is stored as a template without arguments
+        self.template = message if template is None else template
+        self.args = args
+    
+    @property
+    def message(self) -> str:
+        if self.args is None:
+            return self.template
+        return self.template % self.args
+    
+    @message.setter
+    def message(self, message: str):
+        self.template = message
+        self.args = None
+    
+    def __eq__(self, other):
+        if not isinstance(other, CodeIssue):
+            return NotImplemented
+        return (self.line, self.issue_type, self.message, self.severity) == \
+            (other.line, other.issue_type, other.message, other.severity)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return (f"CodeIssue(line={self.line!r}, issue_type={self.issue_type!r}, "
+                f"message={self.message!r}, severity={self.severity!r})")
+    
+    def __reduce__(self):
+        # Rebuilt through __init__ so strings are interned in the receiving process
+        return CodeIssue, (self.line, self.issue_type, None, self.severity, self.template, self.args)
+
+MAX_PARAMETERS = 5
+MAX_NESTING_DEPTH = 3
+
+# Long lines are recorded down to this length (or max_line_length, if lower),
+# so raising or lowering the limit above it reuses cached facts
+LONG_LINE_FLOOR = 80
+
+# Message templates, shared by every issue that uses them ('%' formatting is
+# the quickest to render)
+FUNCTION_TOO_LONG = "Function '%s' is too long (%d lines)"
+TOO_MANY_PARAMETERS = "Function '%s' has too many parameters (%d)"
+DEEP_NESTING = "Code block has deep nesting (depth: %d)"
+LINE_TOO_LONG = "Line too long (>%d characters)"
+
+class FunctionFact(NamedTuple):
+    name: str
+    line: int
+    length: int
+    param_count: int
+
+class BlockFact(NamedTuple):
+    """An outermost control block and the deepest nesting reached inside it"""
     line: int
-    issue_type: str
-    message: str
-    severity: str
+    depth: int
+
+@dataclass
+class FileFacts:
+    """Configuration-independent measurements of one file, from which issues are derived per run"""
+    # Functions and nested blocks, in the order their issues are reported
+    structure: List[Union[FunctionFact, BlockFact]] = field(default_factory=list)
+    # (line, length after stripping whitespace) of lines above the line floor
+    long_lines: List[Tuple[int, int]] = field(default_factory=list)
+    # (issue type, message) when the file could not be read or parsed
+    failure: Optional[Tuple[str, str]] = None
+
+class ComplexityChecker:
+    """Turns measured function and block facts into complexity issues"""
+
+    def __init__(self, config):
+        self.config = config
+        self.severity = config.severity_levels.get('complexity', 'warning')
+        self.issues: List[CodeIssue] = []
+
+    def check_function(self, name: str, line: int, func_lines: int, param_count: int):
+        if func_lines > self.config.max_function_lines:
+            self.issues.append(CodeIssue(
+                line=line,
+                issue_type="complexity",
+                severity=self.severity,
+                template=FUNCTION_TOO_LONG,
+                args=(name, func_lines)
+            ))
+
+        # Check for too many parameters
+        if param_count > MAX_PARAMETERS:
+            self.issues.append(CodeIssue(
+                line=line,
+                issue_type="complexity",
+                severity=self.severity,
+                template=TOO_MANY_PARAMETERS,
+                args=(name, param_count)
+            ))
+
+    def check_nesting(self, line: int, depth: int):
+        if depth > MAX_NESTING_DEPTH:
+            self.issues.append(CodeIssue(
+                line=line,
+                issue_type="complexity",
+                severity=self.severity,
+                template=DEEP_NESTING,
+                args=(depth,)
+            ))
+
+class ComplexityVisitor(ast.NodeVisitor):
+    """Single-pass collector of function spans, parameter counts and nesting depths"""
+    # Depth is tracked while descending, so every node is visited once; each
+    # outermost block is recorded with the deepest level reached inside it
+
+    def __init__(self):
+        self.structure: List[Union[FunctionFact, BlockFact]] = []
+        self.depth = 0
+        self.max_depth = 0
+
+    def visit_FunctionDef(self, node):
+        self.structure.append(FunctionFact(node.name, node.lineno, node.end_lineno - node.lineno,
+                                           len(node.args.args)))
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node):
+        # Only plain functions are length- and parameter-checked
+        self._visit_function(node)
+
+    def _visit_function(self, node):
+        saved = self.depth, self.max_depth
+        self.depth = self.max_depth = 0
+        self.generic_visit(node)
+        self.depth, self.max_depth = saved
+
+    def visit_If(self, node):
+        # An ``elif`` is parsed as an If nested in ``orelse`` sharing the
+        # parent's column; it sits at the same depth as the ``if`` it extends.
+        orelse = node.orelse
+        is_elif = (len(orelse) == 1 and isinstance(orelse[0], ast.If)
+                   and orelse[0].col_offset == node.col_offset)
+
+        self._enter_block()
+        self.visit(node.test)
+        for child in node.body:
+            self.visit(child)
+        if not is_elif:
+            for child in orelse:
+                self.visit(child)
+        self._leave_block(node)
+
+        if is_elif:
+            self.visit(orelse[0])
+
+    def visit_block(self, node):
+        self._enter_block()
+        self.generic_visit(node)
+        self._leave_block(node)
+
+    visit_For = visit_While = visit_block
+
+    def visit_With(self, node):
+        # A with statement deepens a region but does not start one
+        if self.depth == 0:
+            self.generic_visit(node)
+        else:
+            self.visit_block(node)
+
+    def _enter_block(self):
+        if self.depth == 0:
+            self.max_depth = 0
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def _leave_block(self, node):
+        self.depth -= 1
+        if self.depth == 0:
+            self.structure.append(BlockFact(node.lineno, self.max_depth))
+
+@contextmanager
+def file_buffer(file_path: str, mapped: bool = False) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Yield a file's contents, memory-mapped when ``mapped`` so it is never copied"""
+    with open(file_path, 'rb') as f:
+        if mapped:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty and special files cannot be mapped
+                buf = None
+            if buf is not None:
+                with buf:
+                    yield buf
+                return
+        yield f.read()
+
+# Bytes scanned per step of iter_long_lines; bounds the memory spent on line lists
+LINE_SCAN_CHUNK = 1 << 18
+
+def _line_break_after(buf, pos: int, end: int) -> int:
+    """Index just past the first line break at or after ``pos`` (a CRLF counts as one)"""
+    found = buf.find(b'\n', pos, end)
+    if found < 0:
+        found = end
+    # Only look for a CR before the LF, so CR-free files are not rescanned to the end
+    cr = buf.find(b'\r', pos, found)
+    if cr >= 0:
+        found = cr
+    elif found == end:
+        return end
+    if buf[found:found + 2] == b'\r\n':
+        return found + 2
+    return found + 1
+
+def iter_long_lines(buf, max_length: int) -> Iterator[Tuple[int, str]]:
+    """Yield (line number, text) for lines longer than ``max_length`` characters, stripped"""
+    # Works over any bytes-like buffer, including an mmap, a bounded chunk of
+    # whole lines at a time.  Lines break at LF, CRLF and lone CR, as in
+    # readlines(); lengths are compared in C and only candidates are decoded.
+    # A line's byte length is never below its character length, so none is missed.
+    longer = max_length.__lt__
+    line_no = 1
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        stop = pos + LINE_SCAN_CHUNK
+        if stop >= end:
+            stop = end
+        else:
+            last = max(buf.rfind(b'\n', pos, stop), buf.rfind(b'\r', pos, stop))
+            stop = _line_break_after(buf, last if last >= 0 else stop, end)
+        chunk = buf[pos:stop]
+        pos = stop
+        if b'\r' in chunk:
+            chunk = chunk.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        lines = chunk.split(b'\n')
+        for i in compress(count(), map(longer, map(len, lines))):
+            text = lines[i].decode('utf-8', errors='replace')
+            if len(text.strip()) > max_length:
+                yield line_no + i, text
+        line_no += len(lines) - 1
 
 class CodeAnalyzer:
-    def __init__(self, config_path: str = '.aireviewer.json'):
-        self.supported_extensions = ['.py', '.js', '.ts', '.java', '.cpp', '.c']
-        self.config_manager = ConfigManager(config_path)
-        self.config = self.config_manager.config
+    def __init__(self, config_path: str = '.aireviewer.json', cache=None, profiler=None, stats=None,
+                 config: Optional[AnalysisConfig] = None):
+        self.supported_extensions = frozenset({'.py', '.js', '.ts', '.java', '.cpp', '.c'})
+        self.config_manager = ConfigManager(config_path, config)
+        self.cache = cache
+        # Optional profiler.Profiler; phases are only timed when one is attached
+        self.profiler = profiler
+        # Optional stats.MetricColumns recording the facts behind every result
+        self.stats = stats
+        self.set_config(self.config_manager.config)
+    
+    def set_config(self, config: AnalysisConfig):
+        """Switch to a new configuration for subsequent analyses"""
+        self.config = config
     
     def analyze_file(self, file_path: str) -> List[CodeIssue]:
         """Analyze a single file and return list of issues"""
+        return self.analyze_file_with_hash(file_path)[0]
+    
+    def iter_issues(self, paths: Union[str, Iterable[str]]) -> Iterator[Tuple[str, List[CodeIssue]]]:
+        """Yield (path, issues) for each file as soon as it has been analyzed"""
+        if isinstance(paths, str):
+            paths = (paths,)
+        for file_path in paths:
+            yield file_path, self.analyze_file(file_path)
+    
+    def analyze_file_with_hash(self, file_path: str, content_hash: Optional[str] = None) -> Tuple[List[CodeIssue], Optional[str]]:
+        """Analyze a file, returning its issues and content hash (None without a cache)"""
+        if self.profiler is None:
+            return self._analyze_file(file_path, content_hash)
+        
+        self.profiler.begin_file()
+        try:
+            return self._analyze_file(file_path, content_hash)
+        finally:
+            self.profiler.end_file(file_path)
+    
+    def _analyze_file(self, file_path: str, content_hash: Optional[str]) -> Tuple[List[CodeIssue], Optional[str]]:
         if not os.path.exists(file_path):
-            return []
+            return [], None
         
         extension = os.path.splitext(file_path)[1].lower()
         
-        if extension == '.py':
-            return self._analyze_python_file(file_path)
-        else:
-            return self._basic_analysis(file_path)
-    
-    def _analyze_python_file(self, file_path: str) -> List[CodeIssue]:
-        """Analyze Python file for common issues"""
-        issues = []
+        # A hash known from an earlier run is tried first, so a hit skips reading the file
+        if self.cache is not None and content_hash is not None:
+            issues = self._cached_issues(self._cache_key(content_hash, extension))
+            if issues is not None:
+                return issues, content_hash
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                tree = ast.parse(content)
-                
-            # Check for long functions and other complexity issues
-            if 'complexity' in self.config.enabled_checks:
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.FunctionDef):
-                        func_lines = node.end_lineno - node.lineno
-                        if func_lines > self.config.max_function_lines:
-                            issues.append(CodeIssue(
-                                line=node.lineno,
-                                issue_type="complexity",
-                                message=f"Function '{node.name}' is too long ({func_lines} lines)",
-                                severity=self.config.severity_levels.get('complexity', 'warning')
-                            ))
-                        
-                        # Check for too many parameters
-                        param_count = len(node.args.args)
-                        if param_count > 5:
-                            issues.append(CodeIssue(
-                                line=node.lineno,
-                                issue_type="complexity",
-                                message=f"Function '{node.name}' has too many parameters ({param_count})",
-                                severity=self.config.severity_levels.get('complexity', 'warning')
-                            ))
-                    
-                    # Check for deep nesting
-                    if isinstance(node, (ast.If, ast.For, ast.While)):
-                        nesting_depth = self._calculate_nesting_depth(node)
-                        if nesting_depth > 3:
-                            issues.append(CodeIssue(
-                                line=node.lineno,
-                                issue_type="complexity",
-                                message=f"Code block has deep nesting (depth: {nesting_depth})",
-                                severity=self.config.severity_levels.get('complexity', 'warning')
-                            ))
-                        
-        except Exception as e:
-            issues.append(CodeIssue(
+            # Only the Python path needs the decoded text; other files are
+            # scanned in place through a memory map
+            start = time.perf_counter()
+            with file_buffer(file_path, mapped=extension != '.py') as data:
+                if self.profiler is not None:
+                    self.profiler.mark('read', start)
+                return self._analyze_content(data, extension, content_hash)
+        except OSError as e:
+            return [CodeIssue(
                 line=1,
-                issue_type="syntax",
-                message=f"Failed to parse file: {str(e)}",
+                issue_type="error",
+                message=f"Failed to read file: {str(e)}",
                 severity="error"
-            ))
+            )], None
+    
+    def analyze_source(self, source: Union[str, bytes], filename: str, blob_id: Optional[str] = None) -> List[CodeIssue]:
+        """Analyze in-memory source; ``filename`` only selects which checks apply"""
+        data = source.encode('utf-8') if isinstance(source, str) else bytes(source)
+        extension = os.path.splitext(filename)[1].lower()
+        if self.profiler is None:
+            return self._analyze_source(data, extension, blob_id)
         
+        self.profiler.begin_file()
+        try:
+            return self._analyze_source(data, extension, blob_id)
+        finally:
+            self.profiler.end_file(filename)
+    
+    def _analyze_source(self, data: bytes, extension: str, blob_id: Optional[str]) -> List[CodeIssue]:
+        if blob_id is None or self.cache is None:
+            return self._analyze_content(data, extension)[0]
+        
+        # A git blob id keys the cache directly, so the contents need not be hashed;
+        # blob ids live in their own namespace so they never collide with content hashes
+        key = self._cache_key('git-blob:' + blob_id, extension)
+        issues = self._cached_issues(key)
+        if issues is None:
+            issues = self._analyze_and_store(data, extension, key)
         return issues
     
-    def _calculate_nesting_depth(self, node):
-        """Calculate the nesting depth of a code block"""
-        def count_nested_blocks(n, depth=0):
-            max_depth = depth
-            for child in ast.iter_child_nodes(n):
-                if isinstance(child, (ast.If, ast.For, ast.While, ast.With)):
-                    child_depth = count_nested_blocks(child, depth + 1)
-                    max_depth = max(max_depth, child_depth)
-                else:
-                    child_depth = count_nested_blocks(child, depth)
-                    max_depth = max(max_depth, child_depth)
-            return max_depth
+    def _analyze_content(self, data: bytes, extension: str, content_hash: Optional[str] = None) -> Tuple[List[CodeIssue], Optional[str]]:
+        """Analyze raw contents through the cache, if one is attached"""
+        if self.cache is None:
+            return self._analyze_data(data, extension), None
         
-        return count_nested_blocks(node, 1)
+        with self._phase('hash'):
+            digest = hashlib.sha256(data).hexdigest()
+        key = self._cache_key(digest, extension)
+        # A known hash that already missed needs no second lookup
+        issues = None
+        if digest != content_hash:
+            issues = self._cached_issues(key)
+        if issues is None:
+            issues = self._analyze_and_store(data, extension, key)
+        return issues, digest
     
-    def _basic_analysis(self, file_path: str) -> List[CodeIssue]:
-        """Basic analysis for non-Python files"""
-        issues = []
+    def _cache_key(self, content_hash: str, extension: str) -> str:
+        # Facts depend on the configuration only through the line floor
+        return self.cache.make_key(content_hash, extension, f"line-floor={self._line_floor()}", ANALYZER_VERSION)
+    
+    def _cached_issues(self, key: str) -> Optional[List[CodeIssue]]:
+        with self._phase('cache'):
+            facts = self.cache.get(key)
+        return self._issues(facts) if facts is not None else None
+    
+    def _analyze_and_store(self, data: bytes, extension: str, key: str) -> List[CodeIssue]:
+        facts = self.extract_facts(data, extension)
+        with self._phase('cache'):
+            self.cache.put(key, facts)
+        return self._issues(facts)
+    
+    def _phase(self, name: str):
+        """Context timing ``name`` for the current file, or a no-op when not profiling"""
+        return self.profiler.phase(name) if self.profiler is not None else NO_PHASE
+    
+    def _line_floor(self) -> int:
+        return min(LONG_LINE_FLOOR, self.config.max_line_length)
+    
+    def _analyze_data(self, data: bytes, extension: str) -> List[CodeIssue]:
+        """Run the checks for a file's extension on its raw contents"""
+        return self._issues(self.extract_facts(data, extension))
+    
+    def extract_facts(self, data, extension: str) -> FileFacts:
+        """Measure a file's contents; the result does not depend on the thresholds"""
+        if extension == '.py':
+            return self._python_facts(data)
         
+        facts = self._line_facts(data)
+        if extension in CLIKE_EXTENSIONS:
+            try:
+                with self._phase('check.complexity'):
+                    scan = scan_structure(data, extension)
+            except Exception as e:
+                if facts.failure is None:
+                    facts.failure = ("error", f"Failed to scan file: {str(e)}")
+                return facts
+            facts.structure.extend(FunctionFact(func.name, func.line, func.end_line - func.line, func.param_count)
+                                   for func in scan.functions)
+            facts.structure.extend(BlockFact(line, depth) for line, depth in scan.nested_blocks)
+        return facts
+    
+    def _python_facts(self, data: bytes) -> FileFacts:
+        """Parse Python source and collect its function and nesting facts"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            if 'style' in self.config.enabled_checks:
-                for i, line in enumerate(lines, 1):
-                    if len(line.strip()) > self.config.max_line_length:
-                        issues.append(CodeIssue(
-                            line=i,
-                            issue_type="style",
-                            message=f"Line too long (>{self.config.max_line_length} characters)",
-                            severity=self.config.severity_levels.get('style', 'info')
-                        ))
-                        
+            with self._phase('decode'):
+                content = data.decode('utf-8')
+            with self._phase('parse'):
+                tree = ast.parse(content)
+            
+            with self._phase('check.complexity'):
+                visitor = ComplexityVisitor()
+                visitor.visit(tree)
+            return FileFacts(structure=visitor.structure)
+        
         except Exception as e:
-            issues.append(CodeIssue(
-                line=1,
-                issue_type="error",
-                message=f"Failed to read file: {str(e)}",
-                severity="error"
-            ))
+            return FileFacts(failure=("syntax", f"Failed to parse file: {str(e)}"))
+    
+    def _line_facts(self, data) -> FileFacts:
+        """Collect the lines of a non-Python file that are longer than the line floor"""
+        facts = FileFacts()
+        try:
+            with self._phase('check.line_length'):
+                for line_no, text in iter_long_lines(data, self._line_floor()):
+                    facts.long_lines.append((line_no, len(text.strip())))
         
-        return issues
\ No newline at end of file
+        except Exception as e:
+            facts.failure = ("error", f"Failed to read file: {str(e)}")
+        
+        return facts
+    
+    def _issues(self, facts: FileFacts) -> List[CodeIssue]:
+        if self.stats is not None:
+            self.stats.add(facts)
+        return self.apply_policy(facts)
+    
+    def apply_policy(self, facts: FileFacts) -> List[CodeIssue]:
+        """Turn a file's facts into issues under the current configuration"""
+        config = self.config
+        issues = []
+        
+        with self._phase('policy'):
+            if 'style' in config.enabled_checks:
+                max_length = config.max_line_length
+                severity = config.severity_levels.get('style', 'info')
+                args = (max_length,)
+                issues.extend(CodeIssue(line, "style", severity=severity, template=LINE_TOO_LONG, args=args)
+                              for line, length in facts.long_lines if length > max_length)
+            
+            if facts.failure is not None:
+                issue_type, message = facts.failure
+                issues.append(CodeIssue(line=1, issue_type=issue_type, message=message, severity="error"))
+            
+            if 'complexity' in config.enabled_checks and facts.structure:
+                checker = ComplexityChecker(config)
+                for fact in facts.structure:
+                    if isinstance(fact, FunctionFact):
+                        checker.check_function(fact.name, fact.line, fact.length, fact.param_count)
+                    else:
+                        checker.check_nesting(fact.line, fact.depth)
+                issues.extend(checker.issues)
+        
+        return issues
@@ -2,137 +2,507 @@
 Batch analysis module for processing multiple files
 """
 
+import io
 import os
-import glob
-from typing import List, Dict
+import re
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+import vcs
+import worker
 from analyzer import CodeAnalyzer, CodeIssue
 from report import ReportGenerator
+from cache import FileIndex
+from writers import SUMMARY_WRITERS, TextSummaryWriter
+
+# Directories that never hold reviewable sources; pruned before descending.
+# Hidden directories such as .git and .venv are always skipped, as glob did.
+EXCLUDED_DIRS = frozenset({
+    'node_modules', 'bower_components', 'venv', 'site-packages', '__pycache__',
+})
+
+# Streaming pool work: files per submitted chunk, and chunks in flight per worker
+STREAM_CHUNK_SIZE = 16
+STREAM_CHUNKS_PER_JOB = 2
+
+def _translate_segment(segment: str) -> str:
+    """Regex for one path segment of a glob pattern"""
+    parts = []
+    i = 0
+    while i < len(segment):
+        end = _class_end(segment, i) if segment[i] == '[' else -1
+        if segment[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif segment[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif end >= 0:
+            body = segment[i + 1:end]
+            # Escape everything but range dashes; a negated class still never matches '/'
+            if body.startswith('!'):
+                parts.append('[^/' + _escape_class(body[1:]) + ']')
+            else:
+                parts.append('[' + _escape_class(body) + ']')
+            i = end + 1
+        else:
+            parts.append(re.escape(segment[i]))
+            i += 1
+    return ''.join(parts)
+
+def _class_end(segment: str, start: int) -> int:
+    """Index of the ']' closing the class opened at ``start``, or -1 if it is unclosed"""
+    # As in fnmatch, a ']' right after '[' or '[!' is a member, not the end
+    i = start + 1
+    if segment[i:i + 1] == '!':
+        i += 1
+    if segment[i:i + 1] == ']':
+        i += 1
+    return segment.find(']', i)
+
+def _escape_class(body: str) -> str:
+    return ''.join(char if char == '-' else re.escape(char) for char in body)
+
+def _compile_pattern(pattern: str, recursive: bool = True) -> Optional[Callable[[str], bool]]:
+    """Translate a glob pattern into a matcher for '/'-separated relative paths (None matches all)"""
+    if pattern in ('**/*', '**') and recursive:
+        return None
+    
+    # As in glob, '**' spans directories only as a whole segment and only
+    # when recursive; otherwise it matches like '*'
+    
+    segments = pattern.split('/')
+    parts = []
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        if segment == '**' and recursive:
+            parts.append('.*' if last else '(?:[^/]*/)*')
+        else:
+            parts.append(_translate_segment(segment) + ('' if last else '/'))
+    return re.compile(''.join(parts) + r'\Z').match
+
+def _pattern_depth(pattern: str, recursive: bool = True) -> Optional[int]:
+    """Directory levels a pattern can reach below its root; None if unbounded"""
+    segments = pattern.split('/')
+    if recursive and '**' in segments:
+        return None
+    return len(segments) - 1
+
+def walk_source_files(directory: str, extensions: FrozenSet[str], pattern: str = "**/*",
+                      recursive: bool = True, excluded_dirs: FrozenSet[str] = EXCLUDED_DIRS) -> Iterator[str]:
+    """Yield files under ``directory`` with a supported extension, in sorted order"""
+    # Excluded and hidden directories are pruned before they are opened, and
+    # DirEntry types save a stat() per entry; symlinked directories are not followed
+    matcher = _compile_pattern(pattern, recursive)
+    max_depth = _pattern_depth(pattern, recursive)
+    
+    stack = [(directory, '', 0)]
+    while stack:
+        current, prefix, depth = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        
+        descend = max_depth is None or depth < max_depth
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            if name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if descend and name not in excluded_dirs:
+                    subdirs.append((entry.path, prefix + name + '/', depth + 1))
+            elif os.path.splitext(name)[1].lower() in extensions and entry.is_file():
+                if matcher is None or matcher(prefix + name):
+                    yield entry.path
+        
+        stack.extend(reversed(subdirs))
+
+def usable_cpu_count() -> int:
+    """Number of CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def _cpu_time() -> float:
+    """CPU seconds used by this process and its reaped children"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+class AnalysisTask(NamedTuple):
+    file_path: str
+    st: Optional[os.stat_result] = None
+    known_hash: Optional[str] = None
+    # Contents already in memory, such as a git blob; the path is then only a
+    # label and ``known_hash`` holds the blob id, if any
+    data: Optional[bytes] = None
+
+@dataclass
+class BatchStats:
+    files: int
+    wall_time: float
+    cpu_time: float
+    jobs: int
+    
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.wall_time if self.wall_time > 0 else 0.0
+
+class _SymbolTable:
+    """Assigns a small integer id to each distinct value"""
+    
+    def __init__(self):
+        self.values: List[Any] = []
+        self._ids: Dict[Any, int] = {}
+    
+    def id(self, value) -> int:
+        symbol = self._ids.get(value)
+        if symbol is None:
+            symbol = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return symbol
+
+class IssueTable(Mapping):
+    """Batch results as typed columns, read like the dict from ``analyze_directory``"""
+    
+    def __init__(self):
+        self.paths: List[str] = []
+        self._file_ids: Dict[str, int] = {}
+        # Issues of file i are rows offsets[i] to offsets[i + 1]
+        self.offsets = array('Q', [0])
+        self.lines = array('L')
+        self.type_ids = array('H')
+        self.severity_ids = array('H')
+        self.template_ids = array('L')
+        self.args_ids = array('L')
+        self._types = _SymbolTable()
+        self._severities = _SymbolTable()
+        self._templates = _SymbolTable()
+        self._args = _SymbolTable()
+    
+    @classmethod
+    def from_results(cls, results: Iterable[Tuple[str, List[CodeIssue]]]) -> 'IssueTable':
+        table = cls()
+        for file_path, issues in results:
+            table.add(file_path, issues)
+        return table
+    
+    def add(self, file_path: str, issues: List[CodeIssue]):
+        """Append one file's issues; a path added again replaces the earlier entry on lookup"""
+        for issue in issues:
+            self.lines.append(issue.line)
+            self.type_ids.append(self._types.id(issue.issue_type))
+            self.severity_ids.append(self._severities.id(issue.severity))
+            self.template_ids.append(self._templates.id(issue.template))
+            self.args_ids.append(self._args.id(issue.args))
+        self._file_ids[file_path] = len(self.paths)
+        self.paths.append(file_path)
+        self.offsets.append(len(self.lines))
+    
+    @property
+    def issue_count(self) -> int:
+        return len(self.lines)
+    
+    def __getitem__(self, file_path: str) -> List[CodeIssue]:
+        file_id = self._file_ids[file_path]
+        types = self._types.values
+        severities = self._severities.values
+        templates = self._templates.values
+        args = self._args.values
+        return [
+            CodeIssue(self.lines[row], types[self.type_ids[row]], severity=severities[self.severity_ids[row]],
+                      template=templates[self.template_ids[row]], args=args[self.args_ids[row]])
+            for row in range(self.offsets[file_id], self.offsets[file_id + 1])
+        ]
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._file_ids)
+    
+    def __len__(self) -> int:
+        return len(self._file_ids)
 
 class BatchAnalyzer:
-    def __init__(self, config_path: str = '.aireviewer.json'):
-        self.analyzer = CodeAnalyzer(config_path)
+    def __init__(self, config_path: str = '.aireviewer.json', cache=None, jobs: int = 1, profiler=None, stats=None):
+        self.config_path = config_path
+        self.analyzer = CodeAnalyzer(config_path, cache=cache, profiler=profiler, stats=stats)
         self.report_gen = ReportGenerator()
+        self.jobs = max(1, jobs)
+        self.stats: Optional[BatchStats] = None
+        # The stat index only pays off when results can be fetched by hash
+        self.file_index = None
+        if cache is not None:
+            self.file_index = FileIndex(os.path.join(cache.cache_dir, 'index.bin'))
         
     def analyze_directory(self, directory: str, pattern: str = "**/*", recursive: bool = True) -> Dict[str, List[CodeIssue]]:
         """Analyze all matching files in a directory"""
+        return dict(self.iter_results(directory, pattern, recursive))
+    
+    def analyze_directory_table(self, directory: str, pattern: str = "**/*", recursive: bool = True) -> IssueTable:
+        """Like ``analyze_directory``, but keep the results in a compact IssueTable"""
+        return IssueTable.from_results(self.iter_results(directory, pattern, recursive))
+    
+    def iter_results(self, directory: str, pattern: str = "**/*", recursive: bool = True) -> Iterator[Tuple[str, List[CodeIssue]]]:
+        """Yield (path, issues) for each matching file as soon as it is analyzed"""
         if not os.path.isdir(directory):
             raise ValueError(f"Directory not found: {directory}")
         
-        results = {}
-        search_pattern = os.path.join(directory, pattern)
+        # Stream matching files, pruning excluded directories as we go
+        supported_files = walk_source_files(directory, self.analyzer.supported_extensions,
+                                            pattern, recursive)
+        if self.file_index is not None:
+            supported_files = self._prune_after(supported_files, directory, _compile_pattern(pattern, recursive))
+        
+        return self._iter_run(supported_files)
+    
+    def _prune_after(self, file_paths: Iterator[str], directory: str,
+                     matcher: Optional[Callable[[str], bool]]) -> Iterator[str]:
+        """Pass a walk through, then drop index entries it did not reach; a walk cut short prunes nothing"""
+        yield from file_paths
+        self.file_index.prune(directory, matcher)
+    
+    def iter_changed_results(self, directory: str, rev: str, pattern: str = "**/*",
+                             changed_lines: bool = False) -> Iterator[Tuple[str, List[CodeIssue]]]:
+        """Yield (path, issues) for matching files that differ from git revision ``rev``"""
+        if not os.path.isdir(directory):
+            raise ValueError(f"Directory not found: {directory}")
         
-        # Get all matching files
-        files = glob.glob(search_pattern, recursive=recursive)
+        wanted = self._relative_path_filter(pattern)
+        file_paths = []
+        for relative in vcs.changed_files(directory, rev):
+            file_path = os.path.join(directory, relative)
+            if wanted(relative) and os.path.isfile(file_path):
+                file_paths.append(file_path)
         
-        # Filter for supported file types
-        supported_files = []
-        for file_path in files:
-            if os.path.isfile(file_path):
-                ext = os.path.splitext(file_path)[1].lower()
-                if ext in self.analyzer.supported_extensions:
-                    supported_files.append(file_path)
+        results = self._iter_run(file_paths)
+        if not changed_lines:
+            return results
         
-        # Analyze each file
-        for file_path in supported_files:
-            try:
-                issues = self.analyzer.analyze_file(file_path)
-                results[file_path] = issues
-            except Exception as e:
-                print(f"Warning: Failed to analyze {file_path}: {e}")
-                
-        return results
+        hunks = {os.path.join(directory, relative): ranges
+                 for relative, ranges in vcs.changed_hunks(directory, rev).items()}
+        return ((file_path, vcs.filter_to_hunks(issues, hunks.get(file_path, [])))
+                for file_path, issues in results)
+    
+    def iter_tree_results(self, directory: str, treeish: str, pattern: str = "**/*") -> Iterator[Tuple[str, List[CodeIssue]]]:
+        """Yield (path, issues) for matching files in a git tree-ish, without a checkout"""
+        # ``directory`` names a path in the tree; it need not exist on disk
+        top, path = vcs.resolve_tree_path(directory)
+        wanted = self._relative_path_filter(pattern)
+        entries = [(relative, oid) for relative, oid in vcs.list_tree(top, treeish, path) if wanted(relative)]
+        return self._iter_blobs(directory, entries, top)
+    
+    def iter_staged_results(self, directory: str, pattern: str = "**/*") -> Iterator[Tuple[str, List[CodeIssue]]]:
+        """Yield (path, issues) for the blobs of matching files staged in the git index"""
+        if not os.path.isdir(directory):
+            raise ValueError(f"Directory not found: {directory}")
+        
+        wanted = self._relative_path_filter(pattern)
+        entries = [(relative, oid) for relative, oid in vcs.staged_files(directory) if wanted(relative)]
+        return self._iter_blobs(directory, entries)
+    
+    def _iter_blobs(self, directory: str, entries: List[Tuple[str, str]],
+                    repository: Optional[str] = None) -> Iterator[Tuple[str, List[CodeIssue]]]:
+        if not entries:
+            # Nothing to read, so don't start git at all
+            return self._iter_analyze(iter(()))
+        return self._iter_blob_tasks(directory, entries, repository or directory)
+    
+    def _iter_blob_tasks(self, directory: str, entries: List[Tuple[str, str]],
+                         repository: str) -> Iterator[Tuple[str, List[CodeIssue]]]:
+        with vcs.BlobReader(repository) as reader:
+            blobs = reader.read_blobs(oid for _, oid in entries)
+            tasks = (AnalysisTask(os.path.join(directory, relative), known_hash=oid, data=data)
+                     for (relative, oid), data in zip(entries, blobs))
+            yield from self._iter_analyze(tasks)
+    
+    def _relative_path_filter(self, pattern: str) -> Callable[[str], bool]:
+        """Matcher for '/'-separated relative paths applying the same rules as the directory walk"""
+        matcher = _compile_pattern(pattern)
+        extensions = self.analyzer.supported_extensions
+        
+        def wanted(relative: str) -> bool:
+            if any(part.startswith('.') or part in EXCLUDED_DIRS for part in relative.split('/')[:-1]):
+                return False
+            name = relative.rsplit('/', 1)[-1]
+            if name.startswith('.') or os.path.splitext(name)[1].lower() not in extensions:
+                return False
+            return matcher is None or matcher(relative)
+        
+        return wanted
     
     def analyze_files(self, file_paths: List[str]) -> Dict[str, List[CodeIssue]]:
         """Analyze a list of specific files"""
-        results = {}
-        
+        return dict(self._iter_run(self._existing(file_paths)))
+    
+    def _existing(self, file_paths: Iterable[str]) -> Iterator[str]:
         for file_path in file_paths:
             if not os.path.exists(file_path):
-                print(f"Warning: File not found: {file_path}")
+                print(f"Warning: File not found: {file_path}", file=sys.stderr)
                 continue
-                
+            yield file_path
+    
+    def _iter_run(self, file_paths: Iterable[str]) -> Iterator[Tuple[str, List[CodeIssue]]]:
+        """Analyze files on disk, yielding in input order"""
+        # Stat and index lookups stay in this process so the index has one writer
+        return self._iter_analyze(self._iter_tasks(file_paths))
+    
+    def _iter_analyze(self, tasks: Iterator[AnalysisTask]) -> Iterator[Tuple[str, List[CodeIssue]]]:
+        """Run tasks serially or across a process pool, yielding in input order"""
+        start_wall = time.perf_counter()
+        start_cpu = _cpu_time()
+        
+        # Look ahead far enough to avoid starting more workers than there are files
+        head = list(islice(tasks, self.jobs))
+        tasks = chain(head, tasks)
+        jobs = min(self.jobs, len(head))
+        
+        files = 0
+        cache = self.analyzer.cache
+        profiler = self.analyzer.profiler
+        stats = self.analyzer.stats
+        pool = self._create_pool(jobs)
+        try:
+            if pool is not None:
+                outcomes = self._iter_pooled(pool, tasks, window=jobs * STREAM_CHUNKS_PER_JOB)
+            else:
+                outcomes = ((task, self._analyze_local(task)) for task in tasks)
+            
+            for (file_path, st, known_hash, _), outcome in outcomes:
+                issues, content_hash, hits, misses, error, timings, metrics = outcome
+                if error is not None:
+                    print(f"Warning: Failed to analyze {file_path}: {error}", file=sys.stderr)
+                    continue
+                if pool is not None and cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+                if timings is not None:
+                    profiler.merge(timings)
+                if metrics is not None:
+                    stats.merge(metrics)
+                if st is not None and content_hash is not None and content_hash != known_hash:
+                    self.file_index.update(file_path, st, content_hash)
+                files += 1
+                if profiler is None:
+                    yield file_path, issues
+                else:
+                    # Time the consumer's work on this result (rendering, in the CLI)
+                    start = time.perf_counter()
+                    yield file_path, issues
+                    profiler.add(file_path, 'render', start)
+        finally:
+            if pool is not None:
+                # A consumer that stops early should not wait on queued work
+                pool.shutdown(wait=True, cancel_futures=True)
+            if self.file_index is not None:
+                self.file_index.save()
+            self.stats = BatchStats(
+                files=files,
+                wall_time=time.perf_counter() - start_wall,
+                cpu_time=_cpu_time() - start_cpu,
+                jobs=max(jobs, 1)
+            )
+    
+    def _iter_tasks(self, file_paths: Iterable[str]) -> Iterator[AnalysisTask]:
+        for file_path in file_paths:
             try:
-                issues = self.analyzer.analyze_file(file_path)
-                results[file_path] = issues
+                yield self._prepare(file_path)
             except Exception as e:
-                print(f"Warning: Failed to analyze {file_path}: {e}")
-                
-        return results
+                print(f"Warning: Failed to analyze {file_path}: {e}", file=sys.stderr)
+    
+    def _iter_pooled(self, pool: ProcessPoolExecutor, tasks: Iterator, window: int):
+        """Yield (task, outcome) in input order with at most ``window`` chunks submitted"""
+        pending = deque()
+        # Chunks start at one file, for a fast first result, and double up to
+        # STREAM_CHUNK_SIZE to amortize the round trip to the worker
+        size = 1
+        while True:
+            chunk = list(islice(tasks, size))
+            if not chunk:
+                break
+            future = pool.submit(worker.analyze_paths,
+                                 [(task.file_path, task.known_hash, task.data) for task in chunk])
+            pending.append((chunk, future))
+            size = min(size * 2, STREAM_CHUNK_SIZE)
+            if len(pending) >= window:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+        
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+    
+    def _prepare(self, file_path: str) -> AnalysisTask:
+        """Look up a file's last known content hash from its stat signature"""
+        if self.file_index is None:
+            return AnalysisTask(file_path)
+        st = os.stat(file_path)
+        return AnalysisTask(file_path, st, self.file_index.lookup(file_path, st))
+    
+    def _analyze_local(self, task: AnalysisTask):
+        try:
+            if task.data is not None:
+                issues, content_hash = self.analyzer.analyze_source(task.data, task.file_path, task.known_hash), None
+            else:
+                issues, content_hash = self.analyzer.analyze_file_with_hash(task.file_path, task.known_hash)
+        except Exception as e:
+            return [], None, 0, 0, str(e), None, None
+        return issues, content_hash, 0, 0, None, None, None
+    
+    def _create_pool(self, jobs: int) -> Optional[ProcessPoolExecutor]:
+        """Process pool whose workers each build one analyzer at start-up, or None to run serially"""
+        if jobs <= 1:
+            return None
+        
+        cache = self.analyzer.cache
+        initargs = (
+            self.config_path,
+            cache.cache_dir if cache is not None else None,
+            cache.max_bytes / (1024 * 1024) if cache is not None else None,
+            self.analyzer.profiler is not None,
+            self.analyzer.stats is not None,
+            # Workers reuse the loaded config instead of each re-reading (and re-warning about) the file
+            self.analyzer.config,
+        )
+        return ProcessPoolExecutor(max_workers=jobs, initializer=worker.init_worker,
+                                   initargs=initargs)
+    
+    def write_summary_report(self, results: Iterable[Tuple[str, List[CodeIssue]]], out: TextIO, format_type: str = 'text'):
+        """Stream a summary report into ``out`` as results arrive; totals come last"""
+        writer_class = SUMMARY_WRITERS.get(format_type, TextSummaryWriter)
+        writer_class(out).write(results, self._run_details)
     
     def generate_summary_report(self, results: Dict[str, List[CodeIssue]], format_type: str = 'text') -> str:
         """Generate a summary report for batch analysis results"""
-        total_files = len(results)
-        total_issues = sum(len(issues) for issues in results.values())
-        
-        if format_type == 'json':
-            import json
-            from datetime import datetime
-            
-            summary_data = {
-                'analysis_summary': {
-                    'total_files': total_files,
-                    'total_issues': total_issues,
-                    'generated_at': datetime.now().isoformat()
-                },
-                'files': {}
+        items = results.items()
+        if format_type == 'text':
+            # Sort files by issue count (descending)
+            items = sorted(items, key=lambda x: len(x[1]), reverse=True)
+        out = io.StringIO()
+        self.write_summary_report(items, out, format_type)
+        return out.getvalue()
+    
+    def _run_details(self) -> Dict[str, Any]:
+        """Timing and cache counters of the last run, for the end of a summary"""
+        details = {}
+        stats = self.stats
+        if stats is not None:
+            details['timing'] = {
+                'wall_time': round(stats.wall_time, 3),
+                'cpu_time': round(stats.cpu_time, 3),
+                'files_per_second': round(stats.files_per_second, 1),
+                'jobs': stats.jobs
             }
-            
-            for file_path, issues in results.items():
-                summary_data['files'][file_path] = {
-                    'issue_count': len(issues),
-                    'issues': [
-                        {
-                            'line': issue.line,
-                            'type': issue.issue_type,
-                            'message': issue.message,
-                            'severity': issue.severity
-                        } for issue in issues
-                    ]
-                }
-            
-            return json.dumps(summary_data, indent=2)
-        
-        # Text format
-        lines = []
-        lines.append("AI Code Review - Batch Analysis Summary")
-        lines.append("=" * 50)
-        lines.append(f"Files analyzed: {total_files}")
-        lines.append(f"Total issues found: {total_issues}")
-        lines.append("")
-        
-        # Files with issues
-        files_with_issues = {f: issues for f, issues in results.items() if issues}
-        
-        if not files_with_issues:
-            lines.append("✅ No issues found in any files!")
-            return '\n'.join(lines)
-        
-        lines.append(f"Files with issues: {len(files_with_issues)}")
-        lines.append("")
-        
-        # Sort files by issue count (descending)
-        sorted_files = sorted(files_with_issues.items(), key=lambda x: len(x[1]), reverse=True)
-        
-        for file_path, issues in sorted_files:
-            lines.append(f"📄 {file_path}")
-            lines.append(f"   Issues: {len(issues)}")
-            
-            # Group by severity
-            severity_counts = {}
-            for issue in issues:
-                if issue.severity not in severity_counts:
-                    severity_counts[issue.severity] = 0
-                severity_counts[issue.severity] += 1
-            
-            severity_info = []
-            for severity in ['error', 'warning', 'info']:
-                if severity in severity_counts:
-                    count = severity_counts[severity]
-                    icon = {'error': '❌', 'warning': '⚠️', 'info': 'ℹ️'}[severity]
-                    severity_info.append(f"{icon} {count}")
-            
-            if severity_info:
-                lines.append(f"   {' '.join(severity_info)}")
-            lines.append("")
-        
-        return '\n'.join(lines)
\ No newline at end of file
+        cache = self.analyzer.cache
+        if cache is not None:
+            details['cache'] = {
+                'hits': cache.hits,
+                'misses': cache.misses
+            }
+        return details
@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for AI Code Reviewer
+
+Run from the repository root, e.g. ``python -m benchmarks.long_lines``.
+"""
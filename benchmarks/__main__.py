@@ -0,0 +1,62 @@
+"""
+Benchmark runner
+
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare baseline.json results.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from benchmarks.suite import BENCHMARKS, compare, prepare_context, run_suite
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='AI Code Reviewer benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run benchmarks and write results as JSON')
+    run_parser.add_argument('--output', '-o', default='benchmark_results.json', help='Results file')
+    run_parser.add_argument('--repeat', type=int, default=5, help='Timing rounds per benchmark')
+    run_parser.add_argument('--files', type=int, default=40, help='Files in the generated corpus')
+    run_parser.add_argument('--functions', type=int, default=20, help='Functions per generated file')
+    run_parser.add_argument('--nesting-depth', type=int, default=4, help='Block nesting per function')
+    run_parser.add_argument('--body-lines', type=int, default=10, help='Statements per function body')
+    run_parser.add_argument('--seed', type=int, default=0, help='Corpus generator seed')
+    run_parser.add_argument('--only', nargs='+', metavar='PREFIX',
+                            help=f"Benchmarks to run, by name prefix ({', '.join(BENCHMARKS)})")
+
+    compare_parser = subparsers.add_parser('compare', help='Fail if results regressed against a baseline')
+    compare_parser.add_argument('baseline', help='Baseline results file')
+    compare_parser.add_argument('current', help='Current results file')
+    compare_parser.add_argument('--threshold', type=float, default=10.0,
+                                help='Allowed regression in percent (default: 10)')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        with tempfile.TemporaryDirectory(prefix='aireviewer-bench-') as corpus_dir:
+            ctx = prepare_context(corpus_dir, args.repeat, args.files, args.functions,
+                                  args.nesting_depth, args.body_lines, args.seed)
+            results = run_suite(ctx, args.only)
+        results['meta']['corpus'] = {
+            'files': args.files, 'functions': args.functions, 'nesting_depth': args.nesting_depth,
+            'body_lines': args.body_lines, 'seed': args.seed,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to: {args.output}")
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold}%", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold}%")
+
+if __name__ == '__main__':
+    main()
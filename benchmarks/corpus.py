@@ -0,0 +1,76 @@
+"""
+Deterministic synthetic corpus generator for benchmarks
+
+The same arguments and seed always produce byte-identical files, so
+results from different runs and machines are comparable.
+"""
+
+import os
+import random
+from typing import List
+
+def python_source(functions: int, nesting_depth: int, body_lines: int,
+                  long_line_ratio: float = 0.05, seed: int = 0) -> str:
+    """Python module with ``functions`` functions, each nested ``nesting_depth`` deep"""
+    rng = random.Random(seed)
+    lines = ['"""Generated benchmark module"""', '']
+    for i in range(functions):
+        params = ', '.join(f'arg{p}' for p in range(rng.randint(1, 7)))
+        lines.append(f'def function_{i}({params}):')
+        indent = 1
+        for depth in range(nesting_depth):
+            lines.append('    ' * indent + f'if arg0 > {depth}:')
+            indent += 1
+        for j in range(body_lines):
+            if rng.random() < long_line_ratio:
+                values = ', '.join(str(rng.randint(0, 99999)) for _ in range(40))
+                lines.append('    ' * indent + f'table_{j} = [{values}]')
+            else:
+                lines.append('    ' * indent + f'value_{j} = arg0 * {rng.randint(1, 99)} + {j}')
+        lines.append('    ' * indent + 'return arg0')
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+def c_source(functions: int, nesting_depth: int, body_lines: int,
+             long_line_ratio: float = 0.05, seed: int = 0) -> str:
+    """C-like source with the same shape as python_source"""
+    rng = random.Random(seed)
+    lines = ['/* Generated benchmark module */', '#include <stdio.h>', '']
+    for i in range(functions):
+        params = ', '.join(f'int arg{p}' for p in range(rng.randint(1, 7)))
+        lines.append(f'int function_{i}({params}) {{')
+        indent = 1
+        for depth in range(nesting_depth):
+            lines.append('    ' * indent + f'if (arg0 > {depth}) {{')
+            indent += 1
+        for j in range(body_lines):
+            if rng.random() < long_line_ratio:
+                values = ', '.join(str(rng.randint(0, 99999)) for _ in range(40))
+                lines.append('    ' * indent + f'static const int table_{j}[] = {{{values}}};')
+            else:
+                lines.append('    ' * indent + f'int value_{j} = arg0 * {rng.randint(1, 99)} + {j}; // step {j}')
+        lines.append('    ' * indent + 'return arg0;')
+        for _ in range(nesting_depth):
+            indent -= 1
+            lines.append('    ' * indent + '}')
+        lines.append('}')
+        lines.append('')
+    return '\n'.join(lines) + '\n'
+
+def generate_corpus(root: str, files: int = 40, functions: int = 20, nesting_depth: int = 4,
+                    body_lines: int = 10, seed: int = 0) -> List[str]:
+    """Write ``files`` sources under ``root``, alternating Python and C, and return their paths"""
+    paths = []
+    for i in range(files):
+        subdir = os.path.join(root, f'pkg{i % 8}')
+        os.makedirs(subdir, exist_ok=True)
+        if i % 2 == 0:
+            path = os.path.join(subdir, f'module_{i}.py')
+            content = python_source(functions, nesting_depth, body_lines, seed=seed + i)
+        else:
+            path = os.path.join(subdir, f'module_{i}.c')
+            content = c_source(functions, nesting_depth, body_lines, seed=seed + i)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        paths.append(path)
+    return paths
@@ -0,0 +1,68 @@
+"""
+Long-line scanner benchmark: readlines() versus the mmap-backed scanner
+
+Usage: python -m benchmarks.long_lines [--sizes 8 64] [--max-line-length 120]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from analyzer import file_buffer, iter_long_lines
+
+def generate_file(path: str, size_mb: int, seed: int = 0):
+    """Write a generated-looking JS file: mostly short lines, some very long ones"""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            if rng.random() < 0.02:
+                line = 'var data = [' + ','.join(str(rng.randint(0, 9999)) for _ in range(400)) + '];\n'
+            else:
+                line = '  ' * rng.randint(0, 6) + f'x{rng.randint(0, 999)} = call(a, b, c);\n'
+            f.write(line)
+            written += len(line)
+
+def readlines_scan(path: str, max_length: int) -> int:
+    """The previous approach: decode and split the whole file into lines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    return sum(1 for line in lines if len(line.strip()) > max_length)
+
+def mmap_scan(path: str, max_length: int) -> int:
+    with file_buffer(path, mapped=True) as buf:
+        return sum(1 for _ in iter_long_lines(buf, max_length))
+
+def measure(func, path: str, max_length: int, repeat: int = 3):
+    """Return (found, best untraced seconds, peak traced bytes) for a scan"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = func(path, max_length)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(path, max_length)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return found, best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark long-line scanning on synthetic files')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 64], help='File sizes in MB')
+    parser.add_argument('--max-line-length', type=int, default=120)
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'method':<10} {'found':>7} {'MB/s':>8} {'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes:
+            path = os.path.join(tmp, f'generated_{size_mb}.js')
+            generate_file(path, size_mb)
+            for name, func in (('readlines', readlines_scan), ('mmap', mmap_scan)):
+                found, elapsed, peak = measure(func, path, args.max_line_length)
+                print(f"{size_mb:>4}MB {name:<10} {found:>7} {size_mb / elapsed:>8.1f} {peak / 1e6:>9.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""
+Benchmark definitions, timing harness and regression comparison
+"""
+
+import asyncio
+import gc
+import os
+import pickle
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from analyzer import CodeAnalyzer
+from batch import BatchAnalyzer, IssueTable
+from report import ReportGenerator
+from benchmarks.corpus import generate_corpus, python_source, c_source
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark whose optional dependencies are unavailable"""
+
+@dataclass
+class BenchContext:
+    corpus_dir: str
+    repeat: int = 5
+    files: Dict[str, str] = field(default_factory=dict)
+
+# name -> function returning a dict of metrics; each metric's name ends in a
+# suffix from METRIC_DIRECTIONS, and those ending in '_s' are durations in seconds
+BENCHMARKS: Dict[str, Callable[[BenchContext], Dict[str, float]]] = {}
+
+# Metric name suffix -> 1 where higher is better, -1 where lower is better, or
+# 0 for workload sizes that are reported but not judged
+METRIC_DIRECTIONS = {
+    '_s': -1,
+    '_mb': -1,
+    '_per_issue': -1,
+    '_per_second': 1,
+    '_ratio': 1,
+    'issues': 0,
+}
+
+def metric_direction(key: str) -> int:
+    for suffix, direction in METRIC_DIRECTIONS.items():
+        if key.endswith(suffix):
+            return direction
+    raise ValueError(f"No direction known for metric {key!r}; add its suffix to METRIC_DIRECTIONS")
+
+def benchmark(name: str):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+def time_call(func: Callable[[], object], repeat: int, number: int = 1) -> Dict[str, float]:
+    """Best and median seconds per call over ``repeat`` rounds of ``number`` calls"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {'min_s': min(samples), 'median_s': statistics.median(samples)}
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def prepare_context(corpus_dir: str, repeat: int = 5, files: int = 40, functions: int = 20,
+                    nesting_depth: int = 4, body_lines: int = 10, seed: int = 0) -> BenchContext:
+    """Generate the corpus plus a few single-file fixtures under ``corpus_dir``"""
+    ctx = BenchContext(corpus_dir=corpus_dir, repeat=repeat)
+    generate_corpus(os.path.join(corpus_dir, 'tree'), files, functions, nesting_depth, body_lines, seed)
+
+    fixtures = {
+        'python': ('large.py', python_source(200, nesting_depth, body_lines, seed=seed)),
+        'c': ('large.c', c_source(200, nesting_depth, body_lines, seed=seed)),
+        'python_deep': ('deep.py', python_source(50, 60, 2, seed=seed)),
+    }
+    for key, (name, content) in fixtures.items():
+        path = os.path.join(corpus_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        ctx.files[key] = path
+    return ctx
+
+@benchmark('analyze_file.python')
+def bench_analyze_python(ctx: BenchContext):
+    analyzer = CodeAnalyzer()
+    return time_call(lambda: analyzer.analyze_file(ctx.files['python']), ctx.repeat)
+
+@benchmark('analyze_file.python_deep_nesting')
+def bench_analyze_python_deep(ctx: BenchContext):
+    analyzer = CodeAnalyzer()
+    return time_call(lambda: analyzer.analyze_file(ctx.files['python_deep']), ctx.repeat)
+
+@benchmark('analyze_file.c')
+def bench_analyze_c(ctx: BenchContext):
+    analyzer = CodeAnalyzer()
+    return time_call(lambda: analyzer.analyze_file(ctx.files['c']), ctx.repeat)
+
+@benchmark('analyze_directory')
+def bench_analyze_directory(ctx: BenchContext):
+    batch = BatchAnalyzer(jobs=1)
+    tree = os.path.join(ctx.corpus_dir, 'tree')
+    return time_call(lambda: batch.analyze_directory(tree), ctx.repeat)
+
+def retained_bytes(obj) -> int:
+    """Memory held by a fresh copy of ``obj``, rebuilt from a pickle under tracemalloc"""
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        copy = pickle.loads(data)
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del copy
+    return size
+
+@benchmark('memory.batch_results')
+def bench_batch_memory(ctx: BenchContext):
+    results = BatchAnalyzer(jobs=1).analyze_directory(os.path.join(ctx.corpus_dir, 'tree'))
+    issues = max(1, sum(len(file_issues) for file_issues in results.values()))
+    dict_bytes = retained_bytes(results)
+    table_bytes = retained_bytes(IssueTable.from_results(results.items()))
+    return {
+        'issues': issues,
+        'dict_mb': dict_bytes / (1024 * 1024),
+        'dict_bytes_per_issue': dict_bytes / issues,
+        'table_mb': table_bytes / (1024 * 1024),
+        'table_bytes_per_issue': table_bytes / issues,
+    }
+
+def _bench_report(ctx: BenchContext, format_type: str):
+    issues = CodeAnalyzer().analyze_file(ctx.files['python'])
+    report_gen = ReportGenerator()
+    return time_call(lambda: report_gen.generate_report(ctx.files['python'], issues, format_type),
+                     ctx.repeat, number=10)
+
+for _format in ReportGenerator().report_formats:
+    benchmark(f'report.{_format}')(lambda ctx, _format=_format: _bench_report(ctx, _format))
+
+async def _with_client(handler):
+    """Run ``handler(client, source)`` against the app in-process, lifespan included"""
+    try:
+        import httpx
+        from main import app
+    except ImportError as e:
+        raise SkipBenchmark(f"endpoint benchmarks need fastapi and httpx ({e})")
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+            return await handler(client)
+
+def _upload(ctx: BenchContext, variant: Optional[int] = None):
+    """Upload of the Python fixture; a ``variant`` makes the contents unique, defeating the response cache"""
+    with open(ctx.files['python'], 'rb') as f:
+        content = f.read()
+    if variant is not None:
+        content += f'# variant {variant}\n'.encode('ascii')
+    return {'file': ('large.py', content, 'text/x-python')}
+
+@benchmark('endpoint.analyze')
+def bench_endpoint(ctx: BenchContext):
+    uploads = [_upload(ctx, i) for i in range(ctx.repeat * 4 + 1)]
+
+    async def handler(client):
+        await client.post('/analyze', files=uploads[-1])
+        samples = []
+        for files in uploads[:-1]:
+            start = time.perf_counter()
+            response = await client.post('/analyze', files=files)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+        return {'min_s': min(samples), 'median_s': statistics.median(samples)}
+
+    return asyncio.run(_with_client(handler))
+
+async def _timed_post(client, files, latencies: List[float]):
+    start = time.perf_counter()
+    response = await client.post('/analyze', files=files)
+    if response.status_code == 200:
+        latencies.append(time.perf_counter() - start)
+
+@benchmark('endpoint.analyze_concurrent')
+def bench_endpoint_concurrent(ctx: BenchContext, concurrency: int = 16):
+    rounds = [[_upload(ctx, i * concurrency + j) for j in range(concurrency)] for i in range(ctx.repeat)]
+
+    async def handler(client):
+        latencies = []
+        start = time.perf_counter()
+        for uploads in rounds:
+            await asyncio.gather(*(_timed_post(client, files, latencies) for files in uploads))
+        wall = time.perf_counter() - start
+        latencies.sort()
+        return {
+            'p50_s': percentile(latencies, 50),
+            'p99_s': percentile(latencies, 99),
+            'accepted_ratio': len(latencies) / (ctx.repeat * concurrency),
+            'requests_per_second': len(latencies) / wall,
+        }
+
+    return asyncio.run(_with_client(handler))
+
+@benchmark('endpoint.analyze_repeated')
+def bench_endpoint_repeated(ctx: BenchContext, concurrency: int = 16):
+    """The same upload over and over: concurrent duplicates, then cache hits and 304s"""
+    async def handler(client):
+        latencies = []
+        files = _upload(ctx, -1)
+        await asyncio.gather(*(_timed_post(client, files, latencies) for _ in range(concurrency)))
+        duplicates = sorted(latencies)
+
+        hits = []
+        for _ in range(ctx.repeat * 4):
+            await _timed_post(client, files, hits)
+        response = await client.post('/analyze', files=files)
+        etag = response.headers['etag']
+        not_modified = []
+        for _ in range(ctx.repeat * 4):
+            start = time.perf_counter()
+            response = await client.post('/analyze', files=files, headers={'If-None-Match': etag})
+            if response.status_code == 304:
+                not_modified.append(time.perf_counter() - start)
+        return {
+            'duplicates_p50_s': percentile(duplicates, 50),
+            'duplicates_accepted_ratio': len(duplicates) / concurrency,
+            'hit_median_s': statistics.median(hits),
+            'not_modified_median_s': statistics.median(not_modified),
+        }
+
+    return asyncio.run(_with_client(handler))
+
+def run_suite(ctx: BenchContext, only: Optional[List[str]] = None, log=print) -> Dict:
+    """Run the selected benchmarks and return a JSON-serializable result document"""
+    results = {}
+    for name, func in BENCHMARKS.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        try:
+            metrics = func(ctx)
+        except SkipBenchmark as e:
+            log(f"{name:<40} skipped: {e}")
+            continue
+        except Exception as e:
+            log(f"{name:<40} failed: {e}")
+            results[name] = {'error': str(e)}
+            continue
+        results[name] = metrics
+        log(f"{name:<40} " + '  '.join(_format_metric(k, v) for k, v in metrics.items()))
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'repeat': ctx.repeat,
+        },
+        'benchmarks': results,
+    }
+
+def _format_value(key: str, value: float) -> str:
+    if key.endswith('_s'):
+        return f"{value * 1000:.2f}ms"
+    return f"{value:.2f}"
+
+def _format_metric(key: str, value: float) -> str:
+    return f"{key}={_format_value(key, value)}"
+
+def compare(baseline: Dict, current: Dict, threshold_pct: float) -> List[str]:
+    """Return metrics that got worse by more than ``threshold_pct``, and missing or failed benchmarks"""
+    regressions = []
+    current_results = current.get('benchmarks', {})
+    for name, base_metrics in baseline.get('benchmarks', {}).items():
+        if 'error' in base_metrics:
+            continue
+        metrics = current_results.get(name)
+        if metrics is None or 'error' in metrics:
+            reason = 'missing' if metrics is None else f"failed: {metrics['error']}"
+            line = f"{name:<40} {reason}"
+            regressions.append(line)
+            print(line + '  REGRESSION')
+            continue
+        for key, base_value in base_metrics.items():
+            direction = metric_direction(key)
+            value = metrics.get(key)
+            if value is None:
+                line = f"{name:<40} {key:<25} missing"
+                regressions.append(line)
+                print(line + '  REGRESSION')
+                continue
+            if base_value:
+                change = (value - base_value) / base_value * 100
+            else:
+                change = 0.0 if value == base_value else float('inf') * (1 if value > 0 else -1)
+            line = (f"{name:<40} {key:<25} {_format_value(key, base_value):>12} "
+                    f"{_format_value(key, value):>12} {change:>+8.1f}%")
+            if direction and -direction * change > threshold_pct:
+                regressions.append(line)
+                line += '  REGRESSION'
+            print(line)
+    return regressions
@@ -0,0 +1,224 @@
+"""
+Persistent result cache for AI Code Reviewer
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+from analyzer import BlockFact, FileFacts, FunctionFact
+
+DEFAULT_CACHE_DIR = '.aireviewer_cache'
+DEFAULT_CACHE_SIZE_MB = 256
+
+INDEX_MAGIC = b'AIRX'
+INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct('<4sII')      # magic, version, entry count
+_INDEX_ENTRY = struct.Struct('<qqQ32sH')    # size, mtime_ns, inode, sha256, path length
+
+class ResultCache:
+    """Content-addressed store of per-file facts in SQLite, with LRU eviction"""
+    # Writes and recency updates are buffered and flushed in batches, so a run
+    # full of hits does not pay for one disk write per file
+
+    FLUSH_THRESHOLD = 500
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_mb: float = DEFAULT_CACHE_SIZE_MB):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.db_path = os.path.join(cache_dir, 'results.db')
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._pending = {}
+        self._touched = {}
+
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'size INTEGER NOT NULL, last_used REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used)')
+
+    @staticmethod
+    def make_key(content_hash: str, extension: str, config_hash: str, version: str) -> str:
+        """Combine everything that determines a file's result into one key"""
+        raw = f"{version}\0{config_hash}\0{extension}\0{content_hash}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[FileFacts]:
+        """Return the cached facts for a key, or None on a miss"""
+        value = self._pending.get(key)
+        if value is None:
+            row = self._conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value = row[0]
+            self._touched[key] = time.time()
+            self._maybe_flush()
+
+        self.hits += 1
+        structure, long_lines, failure = json.loads(value)
+        # Function facts are stored as 4-element lists, block facts as 2-element ones
+        return FileFacts(
+            structure=[FunctionFact(*fact) if len(fact) == 4 else BlockFact(*fact) for fact in structure],
+            long_lines=[tuple(entry) for entry in long_lines],
+            failure=tuple(failure) if failure is not None else None
+        )
+
+    def put(self, key: str, facts: FileFacts):
+        """Store the facts measured for a key"""
+        value = json.dumps(
+            [facts.structure, facts.long_lines, facts.failure],
+            separators=(',', ':')
+        ).encode('utf-8')
+        self._pending[key] = value
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._pending) + len(self._touched) >= self.FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self):
+        """Write buffered entries to disk and evict if over the size cap"""
+        if not self._pending and not self._touched:
+            return
+
+        now = time.time()
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+                [(key, value, len(value), now) for key, value in self._pending.items()]
+            )
+            self._conn.executemany(
+                'UPDATE results SET last_used = ? WHERE key = ?',
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._evict()
+            self._conn.execute('COMMIT')
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        finally:
+            self._pending.clear()
+            self._touched.clear()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its cap"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        doomed = []
+        cursor = self._conn.execute('SELECT key, size FROM results ORDER BY last_used')
+        for key, size in cursor:
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        cursor.close()
+        self._conn.executemany('DELETE FROM results WHERE key = ?', doomed)
+
+    def close(self):
+        """Flush buffered entries and close the database"""
+        self.flush()
+        self._conn.close()
+
+
+class FileIndex:
+    """Maps file paths to content hashes, validated by a (size, mtime_ns, inode) signature"""
+    # As in git's index, entries modified at or after the moment the index was
+    # last written are racy and always rehashed.  Stored as one packed binary
+    # file: a header, then fixed-size records each trailed by its UTF-8 path.
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.entries: Dict[str, Tuple[int, int, int, bytes]] = {}
+        # Paths looked up or updated since the last prune
+        self._seen: Set[str] = set()
+        self._racy_after = 0
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Read the index file, starting empty if it is missing or unreadable"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+                self._racy_after = os.fstat(f.fileno()).st_mtime_ns
+        except OSError:
+            return
+
+        try:
+            magic, version, count = _INDEX_HEADER.unpack_from(data, 0)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                return
+
+            entries = {}
+            offset = _INDEX_HEADER.size
+            for _ in range(count):
+                size, mtime_ns, inode, digest, path_len = _INDEX_ENTRY.unpack_from(data, offset)
+                offset += _INDEX_ENTRY.size
+                path = os.fsdecode(data[offset:offset + path_len])
+                offset += path_len
+                entries[path] = (size, mtime_ns, inode, digest)
+            self.entries = entries
+        except struct.error:
+            self.entries = {}
+
+    def lookup(self, file_path: str, st: os.stat_result) -> Optional[str]:
+        """Return the known content hash if the file's stat signature is unchanged"""
+        path = os.path.abspath(file_path)
+        self._seen.add(path)
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+        if entry[:3] != (st.st_size, st.st_mtime_ns, st.st_ino) or st.st_mtime_ns >= self._racy_after:
+            return None
+        return entry[3].hex()
+
+    def update(self, file_path: str, st: os.stat_result, content_hash: str):
+        """Record the content hash observed for a file with the given stat signature"""
+        path = os.path.abspath(file_path)
+        self._seen.add(path)
+        self.entries[path] = (st.st_size, st.st_mtime_ns, st.st_ino, bytes.fromhex(content_hash))
+        self._dirty = True
+
+    def prune(self, directory: str, matcher: Optional[Callable[[str], bool]] = None):
+        """Drop entries under ``directory`` a completed walk did not reach, such as deleted or renamed files"""
+        # ``matcher`` limits pruning to the walk's pattern, given '/'-separated relative paths
+        prefix = os.path.join(os.path.abspath(directory), '')
+        stale = [path for path in self.entries
+                 if path.startswith(prefix) and path not in self._seen
+                 and (matcher is None or matcher(path[len(prefix):].replace(os.sep, '/')))]
+        for path in stale:
+            del self.entries[path]
+        if stale:
+            self._dirty = True
+        self._seen.clear()
+
+    def save(self):
+        """Atomically write the index if it changed"""
+        if not self._dirty:
+            return
+
+        chunks = [_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(self.entries))]
+        for path, (size, mtime_ns, inode, digest) in self.entries.items():
+            encoded = os.fsencode(path)
+            chunks.append(_INDEX_ENTRY.pack(size, mtime_ns, inode, digest, len(encoded)))
+            chunks.append(encoded)
+
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(chunks))
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
@@ -6,59 +6,146 @@ CLI interface for AI Code Reviewer
 import argparse
 import sys
 import os
+import time
 from analyzer import CodeAnalyzer
 from report import ReportGenerator
-from batch import BatchAnalyzer
+from batch import BatchAnalyzer, usable_cpu_count
+from cache import ResultCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB
+from profiler import Profiler
+from stats import MetricColumns, format_stats_report
+from vcs import GitError
 
 def main():
     parser = argparse.ArgumentParser(description='AI Code Reviewer - Analyze code files for issues')
     parser.add_argument('path', help='Path to file or directory to analyze')
-    parser.add_argument('--format', choices=['text', 'json', 'html'], default='text', 
+    parser.add_argument('--format', choices=['text', 'json', 'ndjson', 'html', 'sarif'], default='text', 
                        help='Output format (default: text)')
     parser.add_argument('--output', '-o', help='Output file path (optional)')
     parser.add_argument('--batch', action='store_true', help='Batch mode for directory analysis')
     parser.add_argument('--pattern', default='**/*', help='File pattern for batch mode (default: **/*)')
+    parser.add_argument('--jobs', '-j', type=int, default=usable_cpu_count(),
+                       help='Worker processes for batch mode (default: usable CPU count)')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=False,
+                       help='Reuse results for unchanged files from an on-disk cache (default: off)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                       help=f'Cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-size', type=float, default=DEFAULT_CACHE_SIZE_MB,
+                       help=f'Maximum cache size in MB (default: {DEFAULT_CACHE_SIZE_MB})')
+    parser.add_argument('--since', metavar='REV',
+                       help='Only analyze files that differ from git revision REV (implies batch mode)')
+    parser.add_argument('--tree', metavar='TREEISH',
+                       help='Analyze files as stored in a git commit or tree, read from the object database '
+                            'instead of the working tree (implies batch mode)')
+    parser.add_argument('--staged', action='store_true',
+                       help='Analyze files as staged in the git index, e.g. from a pre-commit hook '
+                            '(implies batch mode)')
+    parser.add_argument('--changed-lines', action='store_true',
+                       help='With --since, only report issues on lines changed since REV')
+    parser.add_argument('--stats', action='store_true',
+                       help='Print percentiles and histograms of function length, parameters and nesting '
+                            'to stderr (requires numpy)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Time each analysis phase and print a breakdown to stderr')
+    parser.add_argument('--profile-top', type=int, default=10,
+                       help='Slowest files to list with --profile (default: 10)')
+    parser.add_argument('--profile-trace', metavar='PATH',
+                       help='With --profile, also write a Chrome trace-event JSON file')
     
     args = parser.parse_args()
     
-    if not os.path.exists(args.path):
+    # With --tree the path names a directory in the tree, which need not be checked out
+    if not args.tree and not os.path.exists(args.path):
         print(f"Error: Path '{args.path}' not found", file=sys.stderr)
         sys.exit(1)
     
+    if args.stats:
+        try:
+            import numpy
+        except ImportError:
+            print("Error: --stats requires numpy (pip install numpy)", file=sys.stderr)
+            sys.exit(1)
+    
+    cache = ResultCache(args.cache_dir, args.cache_size) if args.cache else None
+    profiler = Profiler() if args.profile else None
+    stats = MetricColumns() if args.stats else None
+    
+    if args.changed_lines and not args.since:
+        print("Error: --changed-lines requires --since", file=sys.stderr)
+        sys.exit(1)
+    if sum(map(bool, (args.since, args.tree, args.staged))) > 1:
+        print("Error: --since, --tree and --staged cannot be combined", file=sys.stderr)
+        sys.exit(1)
+    
     # Determine analysis mode
-    if args.batch or os.path.isdir(args.path):
+    if args.batch or args.since or args.tree or args.staged or os.path.isdir(args.path):
         # Batch analysis mode
-        batch_analyzer = BatchAnalyzer()
+        batch_analyzer = BatchAnalyzer(cache=cache, jobs=args.jobs, profiler=profiler, stats=stats)
+        config = batch_analyzer.analyzer.config
         
-        if os.path.isdir(args.path):
-            results = batch_analyzer.analyze_directory(args.path, args.pattern)
-        else:
+        if not args.tree and not os.path.isdir(args.path):
             print("Error: Batch mode requires a directory path", file=sys.stderr)
             sys.exit(1)
         
-        # Generate batch report
-        report_content = batch_analyzer.generate_summary_report(results, args.format)
+        # Each file's entry is written as soon as it is analyzed
+        try:
+            if args.since:
+                results = batch_analyzer.iter_changed_results(args.path, args.since, args.pattern,
+                                                              args.changed_lines)
+            elif args.tree:
+                results = batch_analyzer.iter_tree_results(args.path, args.tree, args.pattern)
+            elif args.staged:
+                results = batch_analyzer.iter_staged_results(args.path, args.pattern)
+            else:
+                results = batch_analyzer.iter_results(args.path, args.pattern)
+            # Blobs are read lazily, so git can also fail while the report is written
+            write_output(args.output, lambda out: batch_analyzer.write_summary_report(results, out, args.format))
+        except GitError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
         
     else:
         # Single file analysis mode
-        analyzer = CodeAnalyzer()
+        analyzer = CodeAnalyzer(cache=cache, profiler=profiler, stats=stats)
+        config = analyzer.config
         issues = analyzer.analyze_file(args.path)
         
         # Generate single file report
         report_gen = ReportGenerator()
-        report_content = report_gen.generate_report(args.path, issues, args.format)
+        start = time.perf_counter()
+        write_output(args.output, lambda out: report_gen.write_report(out, args.path, issues, args.format))
+        if profiler is not None:
+            profiler.add(args.path, 'render', start)
+    
+    if cache is not None:
+        cache.close()
+    
+    if stats is not None:
+        print(format_stats_report(stats, config), file=sys.stderr)
     
-    # Output report
-    if args.output:
+    if profiler is not None:
+        print(profiler.format_report(args.profile_top), file=sys.stderr)
+        if args.profile_trace:
+            profiler.write_trace(args.profile_trace)
+            print(f"Trace saved to: {args.profile_trace}", file=sys.stderr)
+
+def write_output(output_path, write):
+    """Call ``write`` with the output file, or stdout when no path is given"""
+    if not output_path:
         try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(report_content)
-            print(f"Report saved to: {args.output}")
-        except Exception as e:
-            print(f"Error saving report: {e}", file=sys.stderr)
+            write(sys.stdout)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader (e.g. head) went away mid-stream; stop quietly
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
             sys.exit(1)
-    else:
-        print(report_content)
+        return
+    try:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            write(f)
+        print(f"Report saved to: {output_path}")
+    except OSError as e:
+        print(f"Error saving report: {e}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""
+Structural scanner for C-family sources (JavaScript, TypeScript, Java, C, C++)
+
+A single regex-driven pass over the raw bytes that skips comments, string,
+template and regex literals, and tracks brace depth.  It recovers each
+function's line span and parameter count and the nesting depth of control
+blocks without building a syntax tree.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+CLIKE_EXTENSIONS = frozenset({'.js', '.ts', '.java', '.c', '.cpp'})
+JS_EXTENSIONS = frozenset({'.js', '.ts'})
+PREPROCESSOR_EXTENSIONS = frozenset({'.c', '.cpp'})
+
+# Keywords whose braced body counts as one level of nesting; 'else' shares the
+# depth of its 'if', matching how the Python check treats elif/else
+CONTROL_KEYWORDS = frozenset({b'if', b'else', b'for', b'while', b'do', b'switch', b'with', b'synchronized'})
+# Keywords that may precede '(' without naming a function
+NON_FUNCTION_KEYWORDS = CONTROL_KEYWORDS | frozenset({
+    b'catch', b'try', b'finally', b'return', b'throw', b'new', b'delete', b'sizeof',
+    b'typeof', b'instanceof', b'in', b'of', b'case', b'await', b'yield', b'void',
+    b'defined', b'static', b'assert',
+})
+# Keywords that introduce an unnamed function: function (...) {, async (...) => {
+ANONYMOUS_KEYWORDS = frozenset({b'function', b'async'})
+# After these keywords a '/' starts a regex literal rather than a division
+REGEX_PREFIX_KEYWORDS = frozenset({
+    b'return', b'typeof', b'case', b'do', b'else', b'in', b'of', b'new', b'delete',
+    b'void', b'throw', b'yield', b'await', b'instanceof',
+})
+
+def _token_pattern(directives: bool, templates: bool, operators: bool, colons: bool = False):
+    """One alternation matching every token the scanner acts on"""
+    # Without regex literals to disambiguate (C, C++, Java), numbers and plain
+    # operators never matter, so the regex engine skips over them
+    parts = [
+        rb'(?P<nl>\n)',
+        rb'(?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))',
+    ]
+    if directives:
+        parts.append(rb'(?P<directive>\#(?:\\\r?\n|[^\n])*)')
+    parts.append(rb'(?P<string>"(?:\\.|[^"\\\n])*"?|\'(?:\\.|[^\'\\\n])*\'?)')
+    if templates:
+        parts.append(rb'(?P<template>`)')
+    parts.append(rb'(?P<ident>[A-Za-z_$][\w$]*)')
+    if operators:
+        parts.append(rb'(?P<number>\.?\d[\w.]*)')
+    parts.append(rb'(?P<arrow>=>|->)')
+    if operators:
+        parts.append(rb'(?P<punct>\S)')
+    elif colons:
+        # ':' introduces a C++ constructor's member initializer list
+        parts.append(rb'(?P<punct>[{}()\[\];,=<>:])')
+    else:
+        parts.append(rb'(?P<punct>[{}()\[\];,=<>])')
+    return re.compile(b'|'.join(parts), re.DOTALL)
+
+_TOKENS_C = _token_pattern(directives=True, templates=False, operators=False, colons=True)
+_TOKENS_JAVA = _token_pattern(directives=False, templates=False, operators=False)
+_TOKENS_JS = _token_pattern(directives=False, templates=True, operators=True)
+
+# Remainder of a template literal, up to its closing backtick or next ${
+# (a lone backslash at end of input is consumed too, so this always matches)
+_TEMPLATE_BODY = re.compile(rb'(?:\\.|\\\Z|[^`\\$]|\$(?!\{))*(?:`|\$\{|\Z)', re.DOTALL)
+# Regex literal body and flags, starting just after the opening '/'
+_REGEX_BODY = re.compile(rb'(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[A-Za-z]*')
+
+# Brace frame kinds
+_OTHER, _CONTROL, _FUNCTION, _TEMPLATE = range(4)
+
+@dataclass
+class FunctionSpan:
+    name: str
+    line: int
+    end_line: int
+    param_count: int
+
+@dataclass
+class StructureScan:
+    functions: List[FunctionSpan] = field(default_factory=list)
+    # (line of the outermost block, deepest nesting level reached inside it)
+    nested_blocks: List[Tuple[int, int]] = field(default_factory=list)
+
+class _ParenGroup:
+    __slots__ = ('name', 'keyword', 'line', 'commas', 'tokens', 'only_void', 'brace_depth', 'inner')
+
+    def __init__(self, name: Optional[bytes], keyword: Optional[bytes], line: int, brace_depth: int):
+        self.name = name
+        self.keyword = keyword
+        self.line = line
+        self.commas = 0
+        self.tokens = 0
+        self.only_void = True
+        self.brace_depth = brace_depth
+        self.inner = 0    # open [ and < inside the group, where commas don't separate parameters
+
+    @property
+    def param_count(self) -> int:
+        if self.tokens == 0 or (self.tokens == 1 and self.only_void):
+            return 0
+        return self.commas + 1
+
+def scan_structure(buf, extension: str) -> StructureScan:
+    """Scan C-family source bytes for function spans and control-block nesting"""
+    is_js = extension in JS_EXTENSIONS
+    if extension in PREPROCESSOR_EXTENSIONS:
+        tokens = _TOKENS_C
+    elif is_js:
+        tokens = _TOKENS_JS
+    else:
+        tokens = _TOKENS_JAVA
+
+    result = StructureScan()
+    line = 1
+    pos = 0
+    end = len(buf)
+
+    frames = []         # one entry per open brace: (kind, payload)
+    parens: List[_ParenGroup] = []
+    group = None        # last closed paren group, while it may still head a block
+    arrow = None        # (name, line, params) of an arrow awaiting its body
+    prev = prev2 = None  # previous two significant tokens, as (kind, value)
+    angles = []         # heads of open '<' groups, for generic functions: f<T>(...)
+    closed_angle = None  # head of the '<' group closed by the last '>'
+    initialized = None  # constructor group whose member initializer list is open
+    prev_line = 1
+
+    # Nesting of control blocks inside the current function
+    depth = max_depth = region_line = 0
+
+    while pos < end:
+        match = tokens.search(buf, pos)
+        if match is None:
+            break
+        kind = match.lastgroup
+        pos = match.end()
+
+        if kind == 'nl':
+            line += 1
+            continue
+        if kind == 'comment' or kind == 'directive':
+            line += match.group().count(b'\n')
+            continue
+        if kind == 'string':
+            # A backslash-newline continues a string onto the next line
+            line += match.group().count(b'\n')
+
+        value = None
+        if kind == 'template':
+            body = _TEMPLATE_BODY.match(buf, pos)
+            pos = body.end()
+            line += body.group().count(b'\n')
+            if body.group().endswith(b'${'):
+                frames.append((_TEMPLATE, None))
+            kind = 'string'
+        elif kind == 'punct':
+            value = match.group()
+            if value == b'/' and is_js and _regex_allowed(prev):
+                literal = _REGEX_BODY.match(buf, pos)
+                if literal is not None:
+                    pos = literal.end()
+                    kind = 'string'
+        elif kind == 'ident':
+            value = match.group()
+
+        # Count what sits directly in the innermost open parameter list
+        top = parens[-1] if parens else None
+        at_group_level = top is not None and top.brace_depth == len(frames)
+        if at_group_level and top.inner == 0 and value != b')' and value != b',':
+            top.tokens += 1
+            if value != b'void':
+                top.only_void = False
+
+        if kind == 'punct':
+            if value == b'(':
+                if prev == ('punct', b'>') and closed_angle is not None:
+                    name, keyword = closed_angle
+                else:
+                    name, keyword = _group_head(prev, prev2)
+                parens.append(_ParenGroup(name, keyword, line, len(frames)))
+                group = None
+            elif value == b')':
+                if parens and parens[-1].brace_depth == len(frames):
+                    group = parens.pop()
+            elif value == b',':
+                if at_group_level and top.inner == 0:
+                    top.commas += 1
+                group = None
+            elif value in b'[<':
+                if value == b'<':
+                    angles.append(_group_head(prev, prev2))
+                if at_group_level and (value == b'[' or prev is not None and prev[0] == 'ident'):
+                    top.inner += 1
+            elif value in b']>':
+                if value == b'>':
+                    closed_angle = angles.pop() if angles else None
+                if at_group_level and top.inner > 0:
+                    top.inner -= 1
+            elif value == b':' and tokens is _TOKENS_C:
+                if prev == ('punct', b')') and group is not None and group.keyword is None:
+                    initialized = group
+                group = None
+            elif value == b';' or value == b'=':
+                group = None
+                arrow = None
+                if value == b';':
+                    angles.clear()
+                    initialized = None
+            elif value == b'{':
+                angles.clear()
+                if initialized is not None and prev is not None and prev[0] != 'ident':
+                    # Body after 'C(int a) : B(a), m{a}'; an ident before '{' is a member's brace-init
+                    group = initialized
+                    initialized = None
+                if initialized is not None:
+                    frames.append((_OTHER, None))
+                elif arrow is not None and prev == ('arrow', None):
+                    frames.append((_FUNCTION, (arrow, depth, max_depth, region_line)))
+                    depth = max_depth = 0
+                elif prev is not None and prev[0] == 'ident' and prev[1] in (b'else', b'do'):
+                    frames.append((_CONTROL, None))
+                    depth, max_depth, region_line = _enter(depth, max_depth, region_line, prev_line)
+                elif group is not None and group.keyword in CONTROL_KEYWORDS:
+                    frames.append((_CONTROL, None))
+                    depth, max_depth, region_line = _enter(depth, max_depth, region_line, group.line)
+                elif group is not None and group.keyword is None:
+                    name = group.name.decode('utf-8', 'replace') if group.name else '<anonymous>'
+                    frames.append((_FUNCTION, ((name, group.line, group.param_count),
+                                               depth, max_depth, region_line)))
+                    depth = max_depth = 0
+                else:
+                    frames.append((_OTHER, None))
+                group = None
+                arrow = None
+            elif value == b'}':
+                angles.clear()
+                if frames:
+                    frame_kind, payload = frames.pop()
+                    # Drop paren groups left open inside the block (unbalanced source)
+                    while parens and parens[-1].brace_depth > len(frames):
+                        parens.pop()
+                    if frame_kind == _FUNCTION:
+                        (name, start_line, param_count), depth, max_depth, region_line = payload
+                        result.functions.append(FunctionSpan(name, start_line, line, param_count))
+                    elif frame_kind == _CONTROL:
+                        depth -= 1
+                        if depth == 0:
+                            result.nested_blocks.append((region_line, max_depth))
+                    elif frame_kind == _TEMPLATE:
+                        body = _TEMPLATE_BODY.match(buf, pos)
+                        pos = body.end()
+                        line += body.group().count(b'\n')
+                        if body.group().endswith(b'${'):
+                            frames.append((_TEMPLATE, None))
+                        kind = 'string'
+                group = None
+        elif kind == 'arrow':
+            # JS '=>' and Java '->' lambdas; the head group stays live so a
+            # C++ trailing return type (f(a) -> int {) still marks a function
+            if group is not None:
+                name = group.name.decode('utf-8', 'replace') if group.name else '<anonymous>'
+                arrow = (name, group.line, group.param_count)
+            elif prev is not None and prev[0] == 'ident':
+                arrow = ('<anonymous>', line, 1)
+
+        prev2 = prev
+        prev = (kind, value)
+        prev_line = line
+
+    return result
+
+def _enter(depth: int, max_depth: int, region_line: int, line: int):
+    """Open one control block; a new outermost region starts at depth zero"""
+    if depth == 0:
+        max_depth = 0
+        region_line = line
+    depth += 1
+    return depth, max(depth, max_depth), region_line
+
+def _group_head(prev, prev2) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """Classify the tokens before '(' as (function name, keyword)"""
+    if prev is None:
+        return None, b''
+    kind, value = prev
+    if kind == 'ident':
+        if prev2 == ('ident', b'new'):
+            return None, b'new'
+        if value in ANONYMOUS_KEYWORDS:
+            return None, None
+        if value in NON_FUNCTION_KEYWORDS:
+            return None, value
+        return value, None
+    if kind == 'punct' and value in (b']', b'>'):
+        # C++ lambda captures, or a generic parameter list in Java/TS
+        return None, None
+    if kind == 'punct' and value in (b'=', b':', b'(', b','):
+        # Possibly an arrow's parameter list; named later if assigned
+        name = prev2[1] if prev2 is not None and prev2[0] == 'ident' and value in (b'=', b':') else None
+        return name, b''
+    return None, b''
+
+def _regex_allowed(prev) -> bool:
+    """Whether a '/' after ``prev`` begins a regex literal"""
+    if prev is None:
+        return True
+    kind, value = prev
+    if kind == 'ident':
+        return value in REGEX_PREFIX_KEYWORDS
+    if kind in ('number', 'string'):
+        return False
+    return value not in (b')', b']', b'}')
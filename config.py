@@ -2,9 +2,11 @@
 Configuration management for AI Code Reviewer
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, Any, List
+import sys
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 
 @dataclass 
@@ -23,15 +25,33 @@ class AnalysisConfig:
                 'complexity': 'warning', 
                 'style': 'info'
             }
+    
+    def fingerprint(self) -> str:
+        """Stable hash of all settings, used to key cached results"""
+        payload = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 class ConfigManager:
-    def __init__(self, config_path: str = '.aireviewer.json'):
+    def __init__(self, config_path: str = '.aireviewer.json', config: Optional[AnalysisConfig] = None):
         self.config_path = config_path
         self.config = AnalysisConfig()
-        self.load_config()
+        self.loaded_mtime_ns = None
+        if config is None:
+            self.load_config()
+        else:
+            # Already loaded by the caller (e.g. the parent of a pool worker)
+            self.config = config
+            self.loaded_mtime_ns = self._stat_mtime_ns()
+    
+    def _stat_mtime_ns(self):
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
     
     def load_config(self):
         """Load configuration from file if it exists"""
+        self.loaded_mtime_ns = self._stat_mtime_ns()
         if os.path.exists(self.config_path):
             try:
                 with open(self.config_path, 'r') as f:
@@ -48,8 +68,18 @@ class ConfigManager:
                     })
                 )
             except Exception as e:
-                print(f"Warning: Failed to load config: {e}")
+                print(f"Warning: Failed to load config: {e}", file=sys.stderr)
                 self.config = AnalysisConfig()
+        else:
+            self.config = AnalysisConfig()
+    
+    def reload_if_changed(self) -> bool:
+        """Reload the configuration if the file's mtime changed; one stat() otherwise"""
+        if self._stat_mtime_ns() == self.loaded_mtime_ns:
+            return False
+        
+        self.load_config()
+        return True
     
     def save_config(self):
         """Save current configuration to file"""
@@ -57,7 +87,7 @@ class ConfigManager:
             with open(self.config_path, 'w') as f:
                 json.dump(asdict(self.config), f, indent=2)
         except Exception as e:
-            print(f"Error saving config: {e}")
+            print(f"Error saving config: {e}", file=sys.stderr)
     
     def create_default_config(self):
         """Create a default configuration file"""
@@ -3,15 +3,64 @@
 AI Code Reviewer - Main application entry point
 """
 
+import asyncio
+import hashlib
 import os
-from fastapi import FastAPI, File, UploadFile
+import time
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, File, Header, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from analyzer import CodeAnalyzer
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from analyzer import ANALYZER_VERSION
+from batch import usable_cpu_count
+from config import AnalysisConfig, ConfigManager
+from memo import ResponseCache, SingleFlight
+from telemetry import Metrics, MetricsMiddleware
+import worker
+
+# Analysis runs on a pool of worker processes so CPU-bound work never blocks
+# the event loop.  Uploads that would start an analysis while QUEUE_DEPTH are
+# already running are refused with 503; cached and coalesced ones never are.
+POOL_WORKERS = int(os.environ.get('AIREVIEWER_WORKERS', usable_cpu_count()))
+QUEUE_DEPTH = int(os.environ.get('AIREVIEWER_QUEUE_DEPTH', POOL_WORKERS * 4))
+RETRY_AFTER_SECONDS = int(os.environ.get('AIREVIEWER_RETRY_AFTER', 1))
+CONFIG_PATH = os.environ.get('AIREVIEWER_CONFIG', '.aireviewer.json')
+# The config file is re-validated by mtime at most this often (seconds)
+CONFIG_CHECK_INTERVAL = float(os.environ.get('AIREVIEWER_CONFIG_CHECK_INTERVAL', 1.0))
+# Responses to repeated uploads are kept in memory, up to this size and age
+RESPONSE_CACHE_MB = float(os.environ.get('AIREVIEWER_RESPONSE_CACHE_MB', 64))
+RESPONSE_CACHE_TTL = float(os.environ.get('AIREVIEWER_RESPONSE_CACHE_TTL', 60.0))
+
+metrics = Metrics()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    config_manager = ConfigManager(CONFIG_PATH)
+    pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, initializer=worker.init_worker,
+                               initargs=(CONFIG_PATH, None, None, False, False, config_manager.config))
+    # Start every worker up front so early requests don't pay for process start-up
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(pool, worker.warm_up) for _ in range(POOL_WORKERS)))
+    
+    app.state.pool = pool
+    app.state.admitted_analyses = 0
+    app.state.pool_tasks = 0
+    app.state.config_manager = config_manager
+    app.state.config_checked_at = time.monotonic()
+    app.state.config_fingerprint = (None, None)
+    app.state.response_cache = ResponseCache(int(RESPONSE_CACHE_MB * 1024 * 1024), RESPONSE_CACHE_TTL)
+    app.state.analyses = SingleFlight()
+    yield
+    pool.shutdown(wait=True, cancel_futures=True)
 
 app = FastAPI(
     title="AI Code Reviewer",
     description="AI-powered code review and analysis tool",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -21,6 +70,53 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+metrics.gauge('aireviewer_admitted_analyses', 'Uploads currently admitted to start a new analysis',
+              lambda: getattr(app.state, 'admitted_analyses', 0))
+metrics.gauge('aireviewer_pool_tasks', 'Analyses submitted to the worker pool and not yet returned',
+              lambda: getattr(app.state, 'pool_tasks', 0))
+metrics.gauge('aireviewer_pool_queue_depth', 'Analyses waiting for a free worker',
+              lambda: max(0, getattr(app.state, 'pool_tasks', 0) - POOL_WORKERS))
+metrics.gauge('aireviewer_pool_workers', 'Worker processes in the analysis pool', lambda: POOL_WORKERS)
+metrics.gauge('aireviewer_queue_limit', 'Admitted analyses before uploads needing a new one are refused with 503',
+              lambda: QUEUE_DEPTH)
+metrics.gauge('aireviewer_response_cache_entries', 'Analysis responses held in the response cache',
+              lambda: len(app.state.response_cache) if hasattr(app.state, 'response_cache') else 0)
+metrics.gauge('aireviewer_response_cache_bytes', 'Size of the response bodies in the response cache',
+              lambda: app.state.response_cache.size if hasattr(app.state, 'response_cache') else 0)
+
+def current_config():
+    """Process-wide config, reloaded only when the file's mtime changes"""
+    now = time.monotonic()
+    if now - app.state.config_checked_at >= CONFIG_CHECK_INTERVAL:
+        app.state.config_checked_at = now
+        app.state.config_manager.reload_if_changed()
+    return app.state.config_manager.config
+
+def config_fingerprint(config: AnalysisConfig) -> str:
+    """``config.fingerprint()``, recomputed only when the config object changes"""
+    cached_config, fingerprint = app.state.config_fingerprint
+    if cached_config is not config:
+        fingerprint = config.fingerprint()
+        app.state.config_fingerprint = (config, fingerprint)
+    return fingerprint
+
+def response_etag(key) -> str:
+    """Strong validator for the response to ``key``, which is fully determined by it"""
+    content_hash, config_hash, filename = key
+    raw = '\0'.join((ANALYZER_VERSION, app.version, config_hash, filename, content_hash))
+    return '"' + hashlib.sha256(raw.encode('utf-8', 'surrogatepass')).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header value"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
 
 @app.get("/")
 async def root():
@@ -30,43 +126,102 @@ async def root():
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition of request, latency and pool metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/admin/reload-config")
+async def reload_config():
+    """Force the configuration file to be re-read"""
+    config_manager = app.state.config_manager
+    config_manager.load_config()
+    app.state.config_checked_at = time.monotonic()
+    return {"status": "reloaded", "config": asdict(config_manager.config)}
+
 @app.post("/analyze")
-async def analyze_code(file: UploadFile = File(...)):
+async def analyze_code(file: UploadFile = File(...), if_none_match: Optional[str] = Header(default=None)):
     """Analyze uploaded code file"""
     if not file.filename:
         return {"error": "No file provided"}
     
-    # Save uploaded file temporarily
-    temp_path = f"/tmp/{file.filename}"
-    
     try:
+        start = time.perf_counter()
         content = await file.read()
-        with open(temp_path, "wb") as f:
-            f.write(content)
+        metrics.upload_read.observe(time.perf_counter() - start)
+        
+        # The response depends only on the contents, the configuration and
+        # the filename (which selects the checks and is echoed back)
+        config = current_config()
+        key = (hashlib.sha256(content).hexdigest(), config_fingerprint(config), file.filename)
+        etag = response_etag(key)
+        if etag_matches(if_none_match, etag):
+            metrics.response_cache.inc(('not_modified',))
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Analyze the file
-        analyzer = CodeAnalyzer()
-        issues = analyzer.analyze_file(temp_path)
+        body = app.state.response_cache.get(key)
+        if body is not None:
+            metrics.response_cache.inc(('hit',))
+            return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
-        # Clean up temp file
-        os.unlink(temp_path)
+        # Concurrent uploads of the same key wait on one analysis; only a
+        # request that starts a new one takes a pool slot, and sheds load
+        # instead of letting queueing latency grow without bound
+        admitted = key not in app.state.analyses
+        if admitted and app.state.admitted_analyses >= QUEUE_DEPTH:
+            return JSONResponse(
+                status_code=503,
+                content={"error": "Server busy, retry later"},
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
         
-        return {
-            "filename": file.filename,
-            "issues_count": len(issues),
-            "issues": [
-                {
-                    "line": issue.line,
-                    "type": issue.issue_type,
-                    "message": issue.message,
-                    "severity": issue.severity
-                } for issue in issues
-            ]
-        }
+        if admitted:
+            app.state.admitted_analyses += 1
+        try:
+            body, shared = await app.state.analyses.do(key, lambda: render_analysis(key, content, config))
+        finally:
+            if admitted:
+                app.state.admitted_analyses -= 1
+        metrics.response_cache.inc(('coalesced' if shared else 'miss',))
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
     except Exception as e:
         return {"error": f"Analysis failed: {str(e)}"}
 
+async def render_analysis(key, content: bytes, config: AnalysisConfig) -> bytes:
+    """Analyze an upload on the worker pool and cache its serialized response"""
+    filename = key[2]
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    app.state.pool_tasks += 1
+    try:
+        issues = await loop.run_in_executor(app.state.pool, worker.analyze_source, content, filename, config)
+    finally:
+        app.state.pool_tasks -= 1
+    metrics.analysis.observe(time.perf_counter() - start)
+    metrics.bytes_analyzed.inc(amount=len(content))
+    if any(issue.issue_type == "syntax" for issue in issues):
+        metrics.parse_failures.inc()
+    
+    # Content is already JSON-native, so skip FastAPI's jsonable_encoder pass
+    start = time.perf_counter()
+    body = JSONResponse(content={
+        "filename": filename,
+        "issues_count": len(issues),
+        "issues": [
+            {
+                "line": issue.line,
+                "type": issue.issue_type,
+                "message": issue.message,
+                "severity": issue.severity
+            } for issue in issues
+        ]
+    }).body
+    metrics.serialization.observe(time.perf_counter() - start)
+    
+    app.state.response_cache.put(key, body)
+    return body
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Response memoization for the API server
+
+``ResponseCache`` keeps recently served response bodies in a size-bounded
+LRU whose entries also expire after a TTL, and ``SingleFlight`` lets
+concurrent requests for the same key share one computation.  Both are only
+used from the event loop thread, so neither needs a lock.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+class ResponseCache:
+    """Response bodies by key, evicted least recently used first and expired after ``ttl`` seconds"""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[float, bytes]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, body = entry
+        if expires <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: Hashable, body: bytes):
+        """Store ``body``, unless it alone exceeds the size cap"""
+        if len(body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, body)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable):
+        _, body = self._entries.pop(key)
+        self.size -= len(body)
+
+class SingleFlight:
+    """Runs at most one computation per key; callers arriving meanwhile await its result"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a computation for ``key`` is running now"""
+        return key in self._calls
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return (result, shared); ``shared`` is True when another caller's computation was reused"""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # Shielded so a caller that goes away does not cancel the work for the others
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark a failure as seen even if every caller has gone away
+            task.exception()
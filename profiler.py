@@ -0,0 +1,125 @@
+"""
+Per-file, per-phase timing for analysis runs (``--profile``)
+
+Phases are timed with ``time.perf_counter``, a system-wide monotonic clock
+on Linux, so events recorded in worker processes line up with the parent's
+in the exported trace.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Shared no-op context for code paths that time phases only when profiling
+NO_PHASE = nullcontext()
+
+# (phase name, start, duration) in perf_counter seconds
+PhaseEvent = Tuple[str, float, float]
+
+class Profiler:
+    """Collects phase timings for each analyzed file"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        # path -> (pid of the process that analyzed it, events)
+        self.files: Dict[str, Tuple[int, List[PhaseEvent]]] = {}
+        self._events: Optional[List[PhaseEvent]] = None
+
+    def begin_file(self):
+        self._events = []
+
+    def end_file(self, file_path: str):
+        self.files[file_path] = (self.pid, self._events)
+        self._events = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._events.append((name, start, time.perf_counter() - start))
+
+    def mark(self, name: str, start: float):
+        """Record ``name`` as having run from ``start`` until now"""
+        self._events.append((name, start, time.perf_counter() - start))
+
+    def add(self, file_path: str, name: str, start: float):
+        """Record a phase for a file that has already finished, such as rendering"""
+        entry = self.files.get(file_path)
+        if entry is not None:
+            entry[1].append((name, start, time.perf_counter() - start))
+
+    def drain(self) -> Dict[str, Tuple[int, List[PhaseEvent]]]:
+        """Return the phase timings recorded so far and start a fresh set"""
+        files, self.files = self.files, {}
+        return files
+
+    def merge(self, files: Dict[str, Tuple[int, List[PhaseEvent]]]):
+        self.files.update(files)
+
+    def phase_totals(self) -> Dict[str, float]:
+        totals = {}
+        for _, events in self.files.values():
+            for name, _, duration in events:
+                totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def slowest(self, count: int) -> List[Tuple[str, float, Dict[str, float]]]:
+        """The ``count`` files with the most time across all phases"""
+        ranked = []
+        for file_path, (_, events) in self.files.items():
+            phases = {}
+            for name, _, duration in events:
+                phases[name] = phases.get(name, 0.0) + duration
+            ranked.append((file_path, sum(phases.values()), phases))
+        ranked.sort(key=lambda x: x[1], reverse=True)
+        return ranked[:count]
+
+    def format_report(self, top: int = 10) -> str:
+        """Phase breakdown and slowest files as text"""
+        totals = self.phase_totals()
+        grand_total = sum(totals.values())
+        file_count = len(self.files)
+
+        lines = []
+        lines.append("Profile")
+        lines.append("=" * 50)
+        lines.append(f"Files: {file_count} | Time in phases: {grand_total:.3f}s")
+        lines.append("")
+        lines.append(f"{'Phase':<20} {'Total':>10} {'Share':>7} {'Per file':>10}")
+        for name, total in sorted(totals.items(), key=lambda x: x[1], reverse=True):
+            share = total / grand_total * 100 if grand_total else 0.0
+            per_file = total / file_count * 1000 if file_count else 0.0
+            lines.append(f"{name:<20} {total:>9.3f}s {share:>6.1f}% {per_file:>8.2f}ms")
+
+        lines.append("")
+        lines.append(f"Slowest files (top {top}):")
+        for file_path, total, phases in self.slowest(top):
+            detail = ', '.join(f"{name} {duration * 1000:.1f}ms"
+                               for name, duration in sorted(phases.items(), key=lambda x: x[1], reverse=True))
+            lines.append(f"{total * 1000:>9.1f}ms  {file_path}  ({detail})")
+        return '\n'.join(lines)
+
+    def write_trace(self, path: str):
+        """Write a Chrome trace-event file (chrome://tracing, Perfetto) with one lane per process"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"traceEvents":[')
+            first = True
+            for file_path, (pid, events) in self.files.items():
+                for name, start, duration in events:
+                    record = {
+                        'name': name,
+                        'cat': 'analysis',
+                        'ph': 'X',
+                        'ts': round(start * 1e6, 1),
+                        'dur': round(duration * 1e6, 1),
+                        'pid': pid,
+                        'tid': pid,
+                        'args': {'file': file_path},
+                    }
+                    f.write(('' if first else ',\n') + json.dumps(record))
+                    first = False
+            f.write(']}\n')
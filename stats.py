@@ -0,0 +1,143 @@
+"""
+Repository-wide statistics over function and nesting facts (``--stats``)
+
+Facts are appended to typed ``array`` columns while files are analyzed,
+which costs little more than a list append and pickles compactly back from
+pool workers.  NumPy only sees the columns at the end, as zero-copy views,
+so percentiles, histograms and threshold counts are whole-column operations
+over the repository instead of a loop over per-issue objects.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+from analyzer import MAX_NESTING_DEPTH, MAX_PARAMETERS, FileFacts, FunctionFact
+from config import AnalysisConfig
+
+PERCENTILES = (50, 75, 90, 95, 99, 100)
+# Histogram bin edges for function length in lines; the last bin is open-ended
+LENGTH_BINS = (0, 10, 20, 30, 40, 50, 75, 100, 150, 200, 300)
+HISTOGRAM_WIDTH = 40
+
+class MetricColumns:
+    """Function and block facts of many files, one typed column per measurement"""
+
+    def __init__(self):
+        self.function_lengths = array('l')
+        self.param_counts = array('l')
+        self.block_depths = array('l')
+        # Only lines above the long-line floor are measured, so these support
+        # threshold counts but not a full length distribution
+        self.long_line_lengths = array('l')
+        self.files = 0
+
+    def add(self, facts: FileFacts):
+        for fact in facts.structure:
+            if isinstance(fact, FunctionFact):
+                self.function_lengths.append(fact.length)
+                self.param_counts.append(fact.param_count)
+            else:
+                self.block_depths.append(fact.depth)
+        self.long_line_lengths.extend(length for _, length in facts.long_lines)
+        self.files += 1
+
+    def drain(self) -> 'MetricColumns':
+        """Move the recorded columns into a new MetricColumns, leaving this one empty"""
+        drained = MetricColumns()
+        drained.merge(self)
+        self.__init__()
+        return drained
+
+    def merge(self, other: 'MetricColumns'):
+        self.function_lengths.extend(other.function_lengths)
+        self.param_counts.extend(other.param_counts)
+        self.block_depths.extend(other.block_depths)
+        self.long_line_lengths.extend(other.long_line_lengths)
+        self.files += other.files
+
+def _column(values: array):
+    """Zero-copy NumPy view of an integer column"""
+    import numpy as np
+    return np.frombuffer(values, dtype=f'i{values.itemsize}')
+
+def threshold_counts(columns: MetricColumns, config: AnalysisConfig) -> Dict[str, Tuple[int, Optional[int]]]:
+    """(facts over the limit, facts measured) per threshold; None totals for line length"""
+    # Line lengths are only measured for long lines
+    import numpy as np
+    lengths = _column(columns.function_lengths)
+    params = _column(columns.param_counts)
+    depths = _column(columns.block_depths)
+    long_lines = _column(columns.long_line_lengths)
+    return {
+        f'function length > {config.max_function_lines}': (
+            int(np.count_nonzero(lengths > config.max_function_lines)), len(lengths)),
+        f'parameters > {MAX_PARAMETERS}': (int(np.count_nonzero(params > MAX_PARAMETERS)), len(params)),
+        f'nesting depth > {MAX_NESTING_DEPTH}': (int(np.count_nonzero(depths > MAX_NESTING_DEPTH)), len(depths)),
+        f'line length > {config.max_line_length}': (
+            int(np.count_nonzero(long_lines > config.max_line_length)), None),
+    }
+
+def _distribution_lines(title: str, values) -> List[str]:
+    """Percentiles of ``values``, each with how many values a limit there would flag"""
+    import numpy as np
+    lines = [f"{title} ({len(values)} measured)"]
+    if not len(values):
+        return lines
+    ordered = np.sort(values)
+    # 'higher' reports observed values: at least p% of values are <= each one
+    points = np.percentile(ordered, PERCENTILES, method='higher')
+    flagged = len(ordered) - np.searchsorted(ordered, points, side='right')
+    lines.append(f"  {'Percentile':<12} {'Value':>8} {'Flagged if limit':>18}")
+    for percentile, point, count in zip(PERCENTILES, points, flagged):
+        label = 'max' if percentile == 100 else f'p{percentile}'
+        lines.append(f"  {label:<12} {int(point):>8} {int(count):>18}")
+    lines.append(f"  mean {values.mean():.1f}")
+    return lines
+
+def _histogram_lines(labels: List[str], counts) -> List[str]:
+    peak = max(int(counts.max()), 1) if len(counts) else 1
+    width = max(len(label) for label in labels) if labels else 0
+    lines = []
+    for label, count in zip(labels, counts):
+        bar = '#' * int(round(int(count) / peak * HISTOGRAM_WIDTH))
+        lines.append(f"  {label:>{width}} {int(count):>8}  {bar}".rstrip())
+    return lines
+
+def format_stats_report(columns: MetricColumns, config: AnalysisConfig) -> str:
+    """Percentiles, histograms and current threshold hits as text"""
+    import numpy as np
+    lengths = _column(columns.function_lengths)
+    params = _column(columns.param_counts)
+    depths = _column(columns.block_depths)
+
+    lines = []
+    lines.append("Metric Statistics")
+    lines.append("=" * 50)
+    lines.append(f"Files: {columns.files} | Functions: {len(lengths)} | Outermost blocks: {len(depths)}")
+    lines.append("")
+
+    lines.append("Over current limits:")
+    for name, (over, total) in threshold_counts(columns, config).items():
+        if total is None:
+            lines.append(f"  {name:<28} {over:>8}")
+            continue
+        share = over / total * 100 if total else 0.0
+        lines.append(f"  {name:<28} {over:>8} of {total:<8} ({share:.1f}%)")
+    lines.append("")
+
+    lines.extend(_distribution_lines("Function length (lines)", lengths))
+    if len(lengths):
+        edges = np.array(LENGTH_BINS + (max(int(lengths.max()), LENGTH_BINS[-1]) + 1,))
+        counts, _ = np.histogram(lengths, bins=edges)
+        labels = [f"{low}-{high - 1}" for low, high in zip(LENGTH_BINS, LENGTH_BINS[1:])]
+        labels.append(f"{LENGTH_BINS[-1]}+")
+        lines.extend(_histogram_lines(labels, counts))
+    lines.append("")
+
+    lines.extend(_distribution_lines("Parameters per function", params))
+    lines.append("")
+
+    lines.extend(_distribution_lines("Nesting depth per outermost block", depths))
+    if len(depths):
+        counts = np.bincount(depths)[1:]
+        lines.extend(_histogram_lines([str(depth) for depth in range(1, len(counts) + 1)], counts))
+    return '\n'.join(lines)
@@ -0,0 +1,148 @@
+"""
+In-process metrics for the API server, rendered in Prometheus text format
+
+Every update happens on the server's event loop thread between awaits, so
+plain integer and float fields are safe without locks, and recording a
+sample is a bisect plus a few additions.  Metrics are per server process;
+with several uvicorn workers, scrape each one (or aggregate by instance).
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+# Latency buckets in seconds, from sub-millisecond reads to slow analyses
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    pairs = ','.join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        if not self.values and not self.label_names:
+            lines.append(f'{self.name} 0')
+        for labels, value in sorted(self.values.items()):
+            suffix = _format_labels(self.label_names, labels) if labels else ''
+            lines.append(f'{self.name}{suffix} {_format_value(value)}')
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; made cumulative only when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f'{self.name}_sum {_format_value(self.sum)}')
+        lines.append(f'{self.name}_count {self.count}')
+        return lines
+
+class Gauge:
+    """A value read from ``read`` at scrape time, so updates cost nothing"""
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} gauge',
+                f'{self.name} {_format_value(self.read())}']
+
+class Metrics:
+    """The API server's metrics; gauges are registered by the app"""
+
+    def __init__(self):
+        self.requests = Counter('aireviewer_http_requests_total',
+                                'HTTP requests by handler and status code', ('handler', 'status'))
+        self.upload_read = Histogram('aireviewer_upload_read_seconds', 'Time reading an upload body')
+        self.analysis = Histogram('aireviewer_analysis_seconds',
+                                  'Time from submitting an upload to the worker pool until its issues return')
+        self.serialization = Histogram('aireviewer_serialization_seconds', 'Time encoding an analysis response')
+        self.bytes_analyzed = Counter('aireviewer_analyzed_bytes_total', 'Bytes of uploaded source analyzed')
+        self.parse_failures = Counter('aireviewer_parse_failures_total', 'Uploads that failed to parse')
+        self.response_cache = Counter('aireviewer_response_cache_total',
+                                      'Analysis responses by how they were produced: hit, miss, coalesced '
+                                      '(shared an in-flight analysis) or not_modified (304)', ('result',))
+        # HTTP requests between entering and leaving MetricsMiddleware
+        self.in_flight = 0
+        self.gauges: List[Gauge] = [
+            Gauge('aireviewer_in_flight_requests', 'HTTP requests currently being handled', lambda: self.in_flight),
+        ]
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]):
+        self.gauges.append(Gauge(name, help_text, read))
+
+    def render(self) -> str:
+        lines = []
+        for metric in (self.requests, self.upload_read, self.analysis, self.serialization,
+                       self.bytes_analyzed, self.parse_failures, self.response_cache, *self.gauges):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests in flight and responses by handler and status"""
+    # A plain ASGI wrapper rather than an ``@app.middleware`` function, which
+    # would add a task and stream copy to every request
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        self.metrics.in_flight += 1
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight -= 1
+            # The router records the matched endpoint in the shared scope, which
+            # keeps the handler label to a fixed set rather than one per URL
+            endpoint = scope.get('endpoint')
+            handler = getattr(endpoint, '__name__', 'unmatched') if endpoint is not None else 'unmatched'
+            self.metrics.requests.inc((handler, str(status)))
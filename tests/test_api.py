@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+
+# httpx drives the app in-process; like the endpoint benchmarks, it is optional
+httpx = pytest.importorskip('httpx')
+import main
+
+def run_with_client(monkeypatch, handler):
+    """Run ``handler(client)`` against the app in-process, lifespan included"""
+    monkeypatch.setattr(main, 'POOL_WORKERS', 1)
+    
+    async def run():
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                return await handler(client)
+    return asyncio.run(run())
+
+def upload(client, content, headers=None):
+    return client.post('/analyze', files={'file': ('a.py', content)}, headers=headers or {})
+
+def test_cached_and_not_modified_responses_skip_admission(monkeypatch):
+    async def handler(client):
+        first = await upload(client, b'def f():\n    pass\n')
+        assert first.status_code == 200
+        
+        monkeypatch.setattr(main, 'QUEUE_DEPTH', 0)
+        repeated = await upload(client, b'def f():\n    pass\n')
+        assert repeated.status_code == 200
+        assert repeated.content == first.content
+        not_modified = await upload(client, b'def f():\n    pass\n', {'If-None-Match': first.headers['ETag']})
+        assert not_modified.status_code == 304
+        
+        refused = await upload(client, b'def g():\n    pass\n')
+        assert refused.status_code == 503
+        assert refused.headers['Retry-After'] == str(main.RETRY_AFTER_SECONDS)
+        assert main.app.state.admitted_analyses == 0
+    run_with_client(monkeypatch, handler)
+
+def test_coalesced_uploads_skip_admission(monkeypatch):
+    monkeypatch.setattr(main, 'QUEUE_DEPTH', 1)
+    
+    async def handler(client):
+        responses = await asyncio.gather(*(upload(client, b'def h():\n    pass\n') for _ in range(8)))
+        assert [response.status_code for response in responses] == [200] * 8
+        assert len({response.content for response in responses}) == 1
+        assert main.app.state.admitted_analyses == 0
+    run_with_client(monkeypatch, handler)
+
+def test_in_flight_gauge_counts_every_http_request(monkeypatch):
+    async def handler(client):
+        await upload(client, b'x = 1\n')
+        await upload(client, b'x = 1\n')
+        await client.get('/health')
+        body = (await client.get('/metrics')).text
+        # The /metrics request itself is the only one in flight
+        assert 'aireviewer_in_flight_requests 1\n' in body
+        assert 'aireviewer_admitted_analyses 0\n' in body
+        assert 'aireviewer_http_requests_total{handler="health_check",status="200"}' in body
+    run_with_client(monkeypatch, handler)
@@ -0,0 +1,74 @@
+import io
+import os
+import pytest
+from batch import BatchAnalyzer
+from cache import FileIndex, ResultCache
+
+@pytest.fixture
+def source_dir(tmp_path):
+    (tmp_path / 'good.py').write_text('x = 1\n')
+    (tmp_path / 'bad.py').write_text('y = 2\n')
+    return tmp_path
+
+@pytest.mark.parametrize('format_type', ['ndjson', 'json', 'sarif'])
+def test_per_file_warnings_stay_out_of_machine_readable_reports(source_dir, monkeypatch, capsys, format_type):
+    batch_analyzer = BatchAnalyzer('/nonexistent.json')
+    analyze = batch_analyzer.analyzer.analyze_file_with_hash
+    
+    def flaky(file_path, known_hash=None):
+        if file_path.endswith('bad.py'):
+            raise OSError("disk on fire")
+        return analyze(file_path, known_hash)
+    monkeypatch.setattr(batch_analyzer.analyzer, 'analyze_file_with_hash', flaky)
+    
+    results = batch_analyzer.iter_results(str(source_dir))
+    batch_analyzer.write_summary_report(results, io.StringIO(), format_type)
+    missing = batch_analyzer.analyze_files([str(source_dir / 'missing.py')])
+    
+    captured = capsys.readouterr()
+    assert missing == {}
+    assert captured.out == ''
+    assert "Warning: Failed to analyze" in captured.err and "disk on fire" in captured.err
+    assert "Warning: File not found" in captured.err
+
+def test_file_index_drops_files_a_walk_no_longer_finds(tmp_path):
+    source = tmp_path / 'src'
+    (source / 'pkg').mkdir(parents=True)
+    for name in ('keep.py', 'gone.py', 'old.py', 'pkg/other.js'):
+        (source / name).write_text('x = 1\n')
+    other = tmp_path / 'elsewhere.py'
+    other.write_text('y = 2\n')
+    index_path = str(tmp_path / 'cache' / 'index.bin')
+    
+    def run(*args):
+        cache = ResultCache(str(tmp_path / 'cache'))
+        try:
+            batch_analyzer = BatchAnalyzer('/nonexistent.json', cache=cache)
+            if args:
+                return batch_analyzer.analyze_directory(str(source), *args)
+            return batch_analyzer.analyze_files([str(other)])
+        finally:
+            cache.close()
+    
+    run()
+    run('**/*')
+    assert {os.path.relpath(path, tmp_path) for path in FileIndex(index_path).entries} == {
+        'elsewhere.py', 'src/keep.py', 'src/gone.py', 'src/old.py', os.path.join('src', 'pkg', 'other.js'),
+    }
+    
+    (source / 'gone.py').unlink()
+    (source / 'old.py').rename(source / 'new.py')
+    # A narrower pattern only prunes the files it would have matched
+    run('*.py')
+    assert {os.path.relpath(path, tmp_path) for path in FileIndex(index_path).entries} == {
+        'elsewhere.py', 'src/keep.py', 'src/new.py', os.path.join('src', 'pkg', 'other.js'),
+    }
+    
+    # A walk the consumer abandons early prunes nothing
+    (source / 'keep.py').unlink()
+    cache = ResultCache(str(tmp_path / 'cache'))
+    results = BatchAnalyzer('/nonexistent.json', cache=cache).iter_results(str(source), '*.py')
+    next(results)
+    results.close()
+    cache.close()
+    assert os.path.join(str(source), 'keep.py') in FileIndex(index_path).entries
@@ -0,0 +1,61 @@
+import pytest
+from benchmarks.suite import compare
+
+BASELINE = {'benchmarks': {
+    'report.json': {'min_s': 0.010, 'median_s': 0.012},
+    'memory.batch_results': {'issues': 1000, 'dict_mb': 1.0, 'table_mb': 0.25, 'table_bytes_per_issue': 64.0},
+    'endpoint.analyze_concurrent': {'p50_s': 0.3, 'accepted_ratio': 0.5, 'requests_per_second': 10.0},
+    'endpoint.broken': {'error': 'no httpx'},
+}}
+
+def current(**changes):
+    results = {name: dict(metrics) for name, metrics in BASELINE['benchmarks'].items()}
+    for path, value in changes.items():
+        name, key = path.split(':')
+        if key:
+            results[name][key] = value
+        elif value is None:
+            del results[name]
+        else:
+            results[name] = value
+    return {'benchmarks': results}
+
+def regressed(result):
+    return [line.split()[:2] for line in compare(BASELINE, result, threshold_pct=10)]
+
+def test_unchanged_results_pass():
+    assert regressed(current()) == []
+
+@pytest.mark.parametrize('path, value', [
+    ('report.json:median_s', 0.02),
+    ('memory.batch_results:table_mb', 0.5),
+    ('memory.batch_results:dict_mb', 1.5),
+    ('memory.batch_results:table_bytes_per_issue', 80.0),
+    ('endpoint.analyze_concurrent:accepted_ratio', 0.25),
+    ('endpoint.analyze_concurrent:requests_per_second', 5.0),
+])
+def test_metrics_getting_worse_regress(path, value):
+    name, key = path.split(':')
+    assert regressed(current(**{path: value})) == [[name, key]]
+
+@pytest.mark.parametrize('path, value', [
+    ('report.json:median_s', 0.005),
+    ('memory.batch_results:table_mb', 0.1),
+    ('memory.batch_results:issues', 2000),
+    ('endpoint.analyze_concurrent:accepted_ratio', 1.0),
+    ('endpoint.analyze_concurrent:requests_per_second', 20.0),
+])
+def test_metrics_improving_or_informational_pass(path, value):
+    assert regressed(current(**{path: value})) == []
+
+def test_missing_and_failed_benchmarks_regress():
+    result = current(**{'report.json:': None, 'memory.batch_results:': {'error': 'boom'}})
+    assert regressed(result) == [['report.json', 'missing'], ['memory.batch_results', 'failed:']]
+
+def test_benchmark_failing_in_baseline_is_ignored():
+    assert regressed(current(**{'endpoint.broken:': None})) == []
+
+def test_metric_without_direction_is_rejected():
+    baseline = {'benchmarks': {'custom': {'widgets': 1.0}}}
+    with pytest.raises(ValueError):
+        compare(baseline, baseline, threshold_pct=10)
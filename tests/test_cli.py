@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+import cli
+
+def git(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+@pytest.fixture
+def repo_missing_blob(tmp_path):
+    """A repository whose HEAD tree lists a blob that is no longer in the object database"""
+    (tmp_path / 'a.py').write_text('x = 1\n')
+    (tmp_path / 'b.py').write_text('y = 2\n')
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, '-c', 'user.name=t', '-c', 'user.email=t@example.com', 'commit', '-qm', 'init')
+    oid = git(tmp_path, 'rev-parse', 'HEAD:b.py')
+    os.remove(tmp_path / '.git' / 'objects' / oid[:2] / oid[2:])
+    return tmp_path
+
+@pytest.mark.parametrize('format_type', ['text', 'ndjson'])
+def test_git_error_while_writing_report_exits_cleanly(repo_missing_blob, monkeypatch, capsys, format_type):
+    monkeypatch.setattr(sys, 'argv', ['cli.py', '--tree', 'HEAD', '--format', format_type, str(repo_missing_blob)])
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main()
+    assert exit_info.value.code == 1
+    err = capsys.readouterr().err
+    assert err.startswith("Error: cannot read object")
+    assert "Traceback" not in err
+
+@pytest.fixture
+def no_checkout_clone(tmp_path):
+    """A clone whose working tree is empty; files exist only in the object database"""
+    source = tmp_path / 'source'
+    (source / 'services' / 'api').mkdir(parents=True)
+    (source / 'services' / 'api' / 'long.js').write_text('var s = "' + 'x' * 200 + '";\n')
+    (source / 'top.js').write_text('var t = "' + 'y' * 200 + '";\n')
+    git(source, 'init', '-q')
+    git(source, 'add', '.')
+    git(source, '-c', 'user.name=t', '-c', 'user.email=t@example.com', 'commit', '-qm', 'init')
+    git(tmp_path, 'clone', '-q', '--no-checkout', str(source), 'clone')
+    return tmp_path / 'clone'
+
+def ndjson_paths(capsys):
+    return sorted(json.loads(line)['file'] for line in capsys.readouterr().out.splitlines())
+
+def test_tree_reads_paths_missing_from_working_tree(no_checkout_clone, monkeypatch, capsys):
+    monkeypatch.chdir(no_checkout_clone)
+    assert not os.path.exists('services')
+    monkeypatch.setattr(sys, 'argv', ['cli.py', '--tree', 'HEAD', '--format', 'ndjson', 'services/api'])
+    cli.main()
+    assert ndjson_paths(capsys) == [os.path.join('services/api', 'long.js')]
+
+def test_tree_resolves_paths_from_another_directory(no_checkout_clone, monkeypatch, capsys):
+    monkeypatch.chdir(no_checkout_clone.parent)
+    target = os.path.join('clone', 'services')
+    monkeypatch.setattr(sys, 'argv', ['cli.py', '--tree', 'HEAD', '--format', 'ndjson', target])
+    cli.main()
+    assert ndjson_paths(capsys) == [os.path.join(target, 'api', 'long.js')]
+    
+    monkeypatch.setattr(sys, 'argv', ['cli.py', '--tree', 'HEAD', '--format', 'ndjson', 'clone'])
+    cli.main()
+    assert ndjson_paths(capsys) == [os.path.join('clone', 'services/api/long.js'), os.path.join('clone', 'top.js')]
@@ -0,0 +1,82 @@
+import pytest
+import analyzer
+from analyzer import CodeAnalyzer
+from clike import scan_structure
+
+# Sources that stop in the middle of a literal or comment
+UNTERMINATED = [
+    ('.js', b'const s = `abc\\'),
+    ('.js', b'const s = `abc ${x'),
+    ('.js', b'const s = `abc'),
+    ('.js', b'const s = "abc\\'),
+    ('.js', b"const s = 'abc"),
+    ('.js', b'function f() { /* never closed'),
+    ('.js', b'x = a.replace(/abc\\'),
+    ('.js', b'x = a.replace(/[abc'),
+    ('.c', b'int f() { char *s = "abc\\'),
+    ('.c', b'#define X \\'),
+    ('.java', b'void f() { String s = "abc'),
+]
+
+@pytest.mark.parametrize('extension, source', UNTERMINATED)
+def test_unterminated_literals_do_not_crash_the_scanner(extension, source):
+    scan_structure(source, extension)
+
+@pytest.mark.parametrize('extension, source', UNTERMINATED)
+def test_unterminated_literals_analyze_without_failure(extension, source):
+    issues = CodeAnalyzer('/nonexistent.json').analyze_source(source, 'file' + extension)
+    assert not [issue for issue in issues if issue.issue_type == 'error']
+
+def test_scanner_errors_become_file_level_issues(monkeypatch):
+    def broken_scan(buf, extension):
+        raise ValueError("boom")
+    monkeypatch.setattr(analyzer, 'scan_structure', broken_scan)
+
+    issues = CodeAnalyzer('/nonexistent.json').analyze_source(b'function f() {}', 'a.js')
+    assert [(issue.issue_type, issue.severity) for issue in issues] == [('error', 'error')]
+    assert 'boom' in issues[0].message
+
+def test_template_literal_spans_lines():
+    source = b'function f() {\n  return `a\n${b}\nc`;\n}\n'
+    scan = scan_structure(source, '.js')
+    assert [(func.name, func.line, func.end_line) for func in scan.functions] == [('f', 1, 5)]
+
+def spans(source, extension):
+    return [(func.name, func.line, func.end_line, func.param_count)
+            for func in scan_structure(source, extension).functions]
+
+@pytest.mark.parametrize('extension', ['.js', '.c', '.java'])
+def test_string_continuation_lines_are_counted(extension):
+    source = (b'int f() {\n'
+              b'  s = "first \\\n'
+              b'second";\n'
+              b'  return 0;\n'
+              b'}\n'
+              b'int h() {\n'
+              b'  return 1;\n'
+              b'}\n')
+    assert spans(source, extension) == [('f', 1, 5, 0), ('h', 6, 8, 0)]
+
+def test_generic_functions_keep_their_names():
+    source = (b'function g<T>(a: T, b: T): T {\n'
+              b'  return a;\n'
+              b'}\n'
+              b'const k = <T>(x: T) => {\n'
+              b'  return x;\n'
+              b'};\n')
+    assert spans(source, '.ts') == [('g', 1, 3, 2), ('k', 4, 6, 1)]
+
+def test_generic_constructor_call_is_not_a_function():
+    source = b'class A {\n  A() {\n    x = new ArrayList<>();\n  }\n}\n'
+    assert spans(source, '.java') == [('A', 2, 4, 0)]
+
+def test_constructor_initializer_list_names_the_constructor():
+    source = (b'C::C(int a, int b) : B(a), m(a), n{b} {\n'
+              b'  if (a) {\n'
+              b'  }\n'
+              b'}\n'
+              b'struct D : public B {\n'
+              b'  D(int a) : m{a} {}\n'
+              b'  int f(int x) { return x ? g(x) : h(x); }\n'
+              b'};\n')
+    assert spans(source, '.cpp') == [('C', 1, 4, 2), ('D', 6, 6, 1), ('f', 7, 7, 1)]
@@ -0,0 +1,114 @@
+import ast
+import time
+import pytest
+from analyzer import BlockFact, CodeAnalyzer, ComplexityVisitor
+
+def blocks(source):
+    visitor = ComplexityVisitor()
+    visitor.visit(ast.parse(source))
+    return [fact for fact in visitor.structure if isinstance(fact, BlockFact)]
+
+def nested_source(functions, depth, body_lines=3):
+    """``functions`` functions, each with one control block nested ``depth`` deep"""
+    lines = []
+    for i in range(functions):
+        lines.append(f"def f{i}(a, b):")
+        for level in range(depth):
+            lines.append("    " * (level + 1) + ("if a:" if level % 2 else f"for x{level} in b:"))
+        indent = "    " * (depth + 1)
+        lines.extend(f"{indent}a = a + {n}" for n in range(body_lines))
+        lines.append("")
+    return "\n".join(lines)
+
+def best_time(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def test_nested_region_reported_once_at_outermost_block():
+    source = (
+        "def f(a):\n"
+        "    for x in a:\n"
+        "        while x:\n"
+        "            if x:\n"
+        "                with x:\n"
+        "                    pass\n"
+        "    if a:\n"
+        "        pass\n"
+    )
+    assert blocks(source) == [BlockFact(2, 4), BlockFact(7, 1)]
+    
+    issues = CodeAnalyzer('/nonexistent.json').analyze_source(source, 'a.py')
+    nesting = [issue for issue in issues if issue.issue_type == 'complexity' and 'nesting' in issue.message]
+    assert [(issue.line, issue.message) for issue in nesting] == [(2, "Code block has deep nesting (depth: 4)")]
+
+def test_elif_chain_is_not_extra_nesting():
+    branches = "".join(f"        elif a == {n}:\n            pass\n" for n in range(10))
+    source = "def f(a):\n    for x in a:\n        if a:\n            pass\n" + branches + "        else:\n            pass\n"
+    assert blocks(source) == [BlockFact(2, 2)]
+
+def test_if_inside_else_is_nested():
+    source = "if a:\n    pass\nelse:\n    if b:\n        pass\n"
+    assert blocks(source) == [BlockFact(1, 2)]
+
+def test_nesting_restarts_inside_functions():
+    source = "for x in a:\n    def g():\n        if x:\n            pass\n"
+    assert blocks(source) == [BlockFact(3, 1), BlockFact(1, 1)]
+
+@pytest.mark.parametrize('depth', [2, 8])
+def test_analysis_time_grows_linearly_with_size(depth):
+    analyzer = CodeAnalyzer('/nonexistent.json')
+    small = nested_source(100, depth)
+    large = nested_source(800, depth)
+    ratio = best_time(lambda: analyzer.analyze_source(large, 'a.py')) / \
+        best_time(lambda: analyzer.analyze_source(small, 'a.py'))
+    # 8x the input; quadratic growth would be ~64x
+    assert ratio < 16
+
+def test_visitor_time_grows_linearly_with_depth():
+    # Same number of statements either way, packed into fewer but deeper functions
+    shallow = ast.parse(nested_source(200, 5, body_lines=75))
+    deep = ast.parse(nested_source(25, 80, body_lines=5))
+    shallow_nodes = sum(1 for _ in ast.walk(shallow))
+    deep_nodes = sum(1 for _ in ast.walk(deep))
+    per_node_shallow = best_time(lambda: ComplexityVisitor().visit(shallow)) / shallow_nodes
+    per_node_deep = best_time(lambda: ComplexityVisitor().visit(deep)) / deep_nodes
+    # Re-walking each block's subtree would make the deep case ~16x slower per node
+    assert per_node_deep / per_node_shallow < 4
+
+def test_async_functions_are_not_length_or_parameter_checked():
+    source = "async def f(a, b, c, d, e, g):\n" + "    pass\n" * 80
+    assert CodeAnalyzer('/nonexistent.json').analyze_source(source, 'a.py') == []
+    assert len(CodeAnalyzer('/nonexistent.json').analyze_source(source[len('async '):], 'a.py')) == 2
+
+def test_with_counts_only_inside_a_region():
+    source = (
+        "with a:\n"
+        "    if a:\n"
+        "        for x in a:\n"
+        "            while x:\n"
+        "                pass\n"
+    )
+    assert blocks(source) == [BlockFact(2, 3)]
+    source = (
+        "if a:\n"
+        "    with a:\n"
+        "        for x in a:\n"
+        "            while x:\n"
+        "                pass\n"
+    )
+    assert blocks(source) == [BlockFact(1, 4)]
+
+def test_async_blocks_do_not_count_as_nesting():
+    source = (
+        "async def f(a):\n"
+        "    for x in a:\n"
+        "        async with x:\n"
+        "            async for y in x:\n"
+        "                if y:\n"
+        "                    pass\n"
+    )
+    assert blocks(source) == [BlockFact(2, 2)]
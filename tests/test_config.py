@@ -0,0 +1,28 @@
+import io
+from batch import BatchAnalyzer
+from config import ConfigManager
+
+def test_malformed_config_warns_on_stderr(tmp_path, capsys):
+    path = tmp_path / '.aireviewer.json'
+    path.write_text('{not json')
+    manager = ConfigManager(str(path))
+    assert manager.config.max_line_length == 120
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    assert captured.err.startswith("Warning: Failed to load config")
+
+def test_pool_workers_reuse_the_loaded_config(tmp_path, capfd):
+    path = tmp_path / '.aireviewer.json'
+    path.write_text('{not json')
+    sources = tmp_path / 'src'
+    sources.mkdir()
+    for i in range(8):
+        (sources / f'm{i}.js').write_text('var s = "' + 'x' * 200 + '";\n')
+    
+    batch_analyzer = BatchAnalyzer(str(path), jobs=2)
+    out = io.StringIO()
+    batch_analyzer.write_summary_report(batch_analyzer.iter_results(str(sources)), out, 'ndjson')
+    assert len(out.getvalue().splitlines()) == 8
+    captured = capfd.readouterr()
+    assert captured.out == ''
+    assert captured.err.count("Warning: Failed to load config") == 1
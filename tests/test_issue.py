@@ -0,0 +1,26 @@
+import pickle
+import pytest
+from analyzer import DEEP_NESTING, CodeIssue
+
+def test_message_and_severity_are_required():
+    with pytest.raises(TypeError):
+        CodeIssue(1, 'style')
+    with pytest.raises(TypeError):
+        CodeIssue(1, 'style', 'Line too long')
+    with pytest.raises(TypeError):
+        CodeIssue(1, 'complexity', template=DEEP_NESTING, args=(4,))
+    with pytest.raises(TypeError):
+        CodeIssue(1, 'complexity', 'deep', 'warning', template=DEEP_NESTING, args=(4,))
+
+def test_template_issue_matches_plain_message():
+    templated = CodeIssue(3, 'complexity', severity='warning', template=DEEP_NESTING, args=(4,))
+    plain = CodeIssue(3, 'complexity', "Code block has deep nesting (depth: 4)", 'warning')
+    assert templated.message == plain.message
+    assert templated == plain
+    assert pickle.loads(pickle.dumps(templated)) == plain
+
+def test_message_is_assignable():
+    issue = CodeIssue(3, 'complexity', severity='warning', template=DEEP_NESTING, args=(4,))
+    issue.message = "rewritten 100%"
+    assert issue.message == "rewritten 100%"
+    assert issue == CodeIssue(3, 'complexity', "rewritten 100%", 'warning')
@@ -0,0 +1,43 @@
+import io
+import mmap
+import pytest
+import analyzer
+from analyzer import file_buffer, iter_long_lines
+
+MAX_LENGTH = 5
+
+def readlines_long_lines(data):
+    """The previous check: decode, split with readlines() and strip each line"""
+    lines = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').readlines()
+    return [(line_no, len(line.strip())) for line_no, line in enumerate(lines, 1)
+            if len(line.strip()) > MAX_LENGTH]
+
+def scanned(buf):
+    return [(line_no, len(text.strip())) for line_no, text in iter_long_lines(buf, MAX_LENGTH)]
+
+SOURCES = {
+    'lf': b'short\nmuch too long\nok\n  padded  \nlonger line here\n',
+    'crlf': b'short\r\nmuch too long\r\nok\r\nlonger line here\r\n',
+    'cr': b'short\rmuch too long\rok\rlonger line here\r',
+    'mixed': b'much too long\r\rok\n\r\nlonger line here\rlast long line',
+    'empty': b'',
+    'no_trailing_newline': b'ok\nmuch too long',
+    'only_long': b'a single line that is long',
+    'unicode': 'caféé\néééééé\n'.encode('utf-8'),
+}
+
+@pytest.mark.parametrize('chunk', [3, 8, analyzer.LINE_SCAN_CHUNK])
+@pytest.mark.parametrize('name', list(SOURCES))
+def test_matches_readlines(name, chunk, monkeypatch):
+    monkeypatch.setattr(analyzer, 'LINE_SCAN_CHUNK', chunk)
+    data = SOURCES[name]
+    assert scanned(data) == readlines_long_lines(data)
+
+@pytest.mark.parametrize('name', ['lf', 'crlf', 'cr', 'no_trailing_newline'])
+def test_mapped_file_matches_readlines(name, tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer, 'LINE_SCAN_CHUNK', 4)
+    path = tmp_path / 'source.js'
+    path.write_bytes(SOURCES[name])
+    with file_buffer(str(path), mapped=True) as buf:
+        assert isinstance(buf, mmap.mmap)
+        assert scanned(buf) == readlines_long_lines(SOURCES[name])
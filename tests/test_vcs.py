@@ -0,0 +1,111 @@
+import subprocess
+import pytest
+from analyzer import CodeIssue
+from vcs import _unquote_path, changed_hunks, filter_to_hunks, parse_hunks
+
+# Captured from ``git -c core.quotePath=false diff -U0 --src-prefix=a/ --dst-prefix=b/``
+# after editing café.py, deleting and changing lines of del.py, renaming and
+# editing old.py, and editing a file whose name holds a tab and quotes
+DIFF = (
+    b'diff --git a/caf\xc3\xa9.py b/caf\xc3\xa9.py\n'
+    b'index b77b4eb..20a747d 100644\n'
+    b'--- a/caf\xc3\xa9.py\n'
+    b'+++ b/caf\xc3\xa9.py\n'
+    b'@@ -2 +2,2 @@ x\n'
+    b'-y\n'
+    b'+Y\n'
+    b'+z\n'
+    b'diff --git a/del.py b/del.py\n'
+    b'index b414108..624f7d0 100644\n'
+    b'--- a/del.py\n'
+    b'+++ b/del.py\n'
+    b'@@ -2,2 +1,0 @@\n'
+    b'-2\n'
+    b'-3\n'
+    b'@@ -6 +4 @@\n'
+    b'-6\n'
+    b'+SIX\n'
+    b'diff --git a/old.py b/new.py\n'
+    b'similarity index 87%\n'
+    b'rename from old.py\n'
+    b'rename to new.py\n'
+    b'index 71ac1b5..1877275 100644\n'
+    b'--- a/old.py\n'
+    b'+++ b/new.py\n'
+    b'@@ -5 +5 @@ d\n'
+    b'-e\n'
+    b'+E\n'
+    b'diff --git "a/tab\\t\\"q\\".py" "b/tab\\t\\"q\\".py"\n'
+    b'index bca70f3..73c52c3 100644\n'
+    b'--- "a/tab\\t\\"q\\".py"\n'
+    b'+++ "b/tab\\t\\"q\\".py"\n'
+    b'@@ -1 +1 @@\n'
+    b'-q\n'
+    b'+Q\n'
+)
+
+def git(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+def test_parse_hunks():
+    assert parse_hunks(DIFF) == {
+        'café.py': [(2, 3)],
+        # The '+1,0' pure deletion has no new-side lines; '+4' omits its count of 1
+        'del.py': [(4, 4)],
+        'new.py': [(5, 5)],
+        'tab\t"q".py': [(1, 1)],
+    }
+
+def test_parse_hunks_skips_sections_without_content_changes():
+    diff = (b'diff --git a/old.py b/new.py\n'
+            b'similarity index 100%\n'
+            b'rename from old.py\n'
+            b'rename to new.py\n'
+            b'diff --git a/run.py b/run.py\n'
+            b'old mode 100644\n'
+            b'new mode 100755\n')
+    assert parse_hunks(diff) == {}
+    assert parse_hunks(b'') == {}
+
+def test_parse_hunks_deletion_at_top_of_file():
+    diff = (b'diff --git a/a.py b/a.py\n'
+            b'index 1111111..2222222 100644\n'
+            b'--- a/a.py\n'
+            b'+++ b/a.py\n'
+            b'@@ -1,3 +0,0 @@\n'
+            b'-a\n-b\n-c\n')
+    assert parse_hunks(diff) == {'a.py': []}
+
+@pytest.mark.parametrize('raw, expected', [
+    (b'b/plain.py', 'b/plain.py'),
+    (b'b/caf\xc3\xa9.py', 'b/café.py'),
+    (b'"b/caf\\303\\251.py"', 'b/café.py'),
+    (b'"b/tab\\t\\"q\\".py"', 'b/tab\t"q".py'),
+    (b'"b/back\\\\slash.py"', 'b/back\\slash.py'),
+    (b'b/space name.py\t', 'b/space name.py'),
+])
+def test_unquote_path(raw, expected):
+    assert _unquote_path(raw) == expected
+
+def test_changed_hunks_reads_working_tree_diff(tmp_path):
+    (tmp_path / 'del.py').write_text('1\n2\n3\n4\n5\n6\n')
+    (tmp_path / 'old.py').write_text('a\nb\nc\nd\ne\nf\ng\nh\n')
+    (tmp_path / 'café.py').write_text('x\ny\n')
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, '-c', 'user.name=t', '-c', 'user.email=t@example.com', 'commit', '-qm', 'init')
+    (tmp_path / 'del.py').write_text('1\n4\n5\nSIX\n')
+    git(tmp_path, 'mv', 'old.py', 'new.py')
+    (tmp_path / 'new.py').write_text('a\nb\nc\nd\nE\nf\ng\nh\n')
+    (tmp_path / 'café.py').write_text('x\nY\nz\n')
+    assert changed_hunks(str(tmp_path), 'HEAD') == {
+        'café.py': [(2, 3)], 'del.py': [(4, 4)], 'new.py': [(5, 5)],
+    }
+
+def test_filter_to_hunks():
+    issues = [CodeIssue(line, 'style', f'line {line}', 'info') for line in range(1, 12)]
+    issues.append(CodeIssue(0, 'syntax', 'cannot parse', 'error'))
+    kept = filter_to_hunks(issues, [(2, 3), (5, 5), (9, 10)])
+    assert [issue.line for issue in kept] == [2, 3, 5, 9, 10, 0]
+    # A file with only deletions keeps just its file-level issues
+    assert [issue.issue_type for issue in filter_to_hunks(issues, [])] == ['syntax']
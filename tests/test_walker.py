@@ -0,0 +1,57 @@
+import glob
+import os
+import pytest
+from batch import BatchAnalyzer, _compile_pattern, walk_source_files
+
+EXTENSIONS = frozenset({'.py', '.js'})
+FILES = [
+    'a.py', 'b.txt', 'c.js',
+    'sub/b.js', 'sub/d.py',
+    'sub/deep/e.py', 'sub/deep/er/f.js',
+    'other/g.py', 'other/sub/h.js',
+    'sub/_i.py', 'back\\slash.py', 'x]y.py',
+]
+PATTERNS = [
+    '*', '*.py', '**', '**/*', '**/*.py', '**/*.js', 'sub/*', 'sub/*.js', 'sub/**',
+    'sub/**/*.py', '*/*.py', '*/*/*', '**/sub/*', 's?b/*', '[so]*/*', '[!s]*/*.py', 'sub**/*', 'sub/deep*/*',
+    '*[!_]*.py', '*/[!_]*.py', '[!a]*', '[\\]*.py', '[a\\]*', '*[]]*', 'x[!]]y.py', '[.]*.py',
+]
+
+@pytest.fixture(scope='module')
+def tree(tmp_path_factory):
+    root = tmp_path_factory.mktemp('tree')
+    for relative in FILES:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x = 1\n')
+    return str(root)
+
+def glob_files(root, pattern, recursive):
+    return sorted(path for path in glob.glob(os.path.join(root, pattern), recursive=recursive)
+                  if os.path.isfile(path) and os.path.splitext(path)[1] in EXTENSIONS)
+
+@pytest.mark.parametrize('recursive', [True, False])
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_walker_matches_glob(tree, pattern, recursive):
+    walked = sorted(walk_source_files(tree, EXTENSIONS, pattern, recursive))
+    assert walked == glob_files(tree, pattern, recursive)
+
+def test_relative_filter_pattern_is_anchored_per_segment():
+    matcher = _compile_pattern('*')
+    assert matcher('a.py')
+    assert not matcher('sub/a.py')
+
+def test_negated_class_does_not_cross_directories(tmp_path):
+    wanted = BatchAnalyzer(str(tmp_path / 'missing.json'))._relative_path_filter('*/[!_]*.py')
+    assert wanted('sub/d.py')
+    assert not wanted('sub/_d.py')
+    assert not wanted('sub/deep/e.py')
+    assert not _compile_pattern('*[!_]*.py')('sub/d.py')
+
+def test_class_contents_are_literal():
+    matcher = _compile_pattern('[\\d]*.py')
+    assert matcher('\\x.py')
+    assert matcher('d.py')
+    assert not matcher('1.py')
+    assert _compile_pattern('[a-c.]x.py')('.x.py')
+    assert not _compile_pattern('[a-c.]x.py')('dx.py')
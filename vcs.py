@@ -0,0 +1,192 @@
+"""
+Git helpers for diff-scoped analysis
+"""
+
+import os
+import re
+import subprocess
+import threading
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from analyzer import CodeIssue
+
+# Issues about a whole file (unreadable, unparsable) are kept however narrow the diff
+FILE_LEVEL_ISSUE_TYPES = frozenset({'error', 'syntax'})
+
+_HUNK_HEADER = re.compile(rb'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@', re.MULTILINE)
+
+class GitError(Exception):
+    """A git command failed, e.g. outside a repository or with an unknown revision"""
+
+def run_git(directory: str, *args: str) -> bytes:
+    """Run git in ``directory`` and return its stdout"""
+    try:
+        completed = subprocess.run(['git', '-C', directory, *args], capture_output=True, check=False)
+    except FileNotFoundError:
+        raise GitError("git executable not found")
+    if completed.returncode != 0:
+        message = completed.stderr.decode('utf-8', 'replace').strip()
+        raise GitError(message or f"git {args[0]} failed with exit code {completed.returncode}")
+    return completed.stdout
+
+def changed_files(directory: str, rev: str) -> List[str]:
+    """Files under ``directory`` changed since ``rev`` in the working tree, minus deletions"""
+    output = run_git(directory, 'diff', '--name-only', '-z', '--relative', '--diff-filter=d',
+                     '--no-ext-diff', rev, '--')
+    return [os.fsdecode(name) for name in output.split(b'\0') if name]
+
+def changed_hunks(directory: str, rev: str) -> Dict[str, List[Tuple[int, int]]]:
+    """Map each changed file to the (first, last) new-side line ranges of its hunks"""
+    output = run_git(directory, '-c', 'core.quotePath=false', 'diff', '--relative', '-U0',
+                     '--no-color', '--no-ext-diff', '--diff-filter=d',
+                     '--src-prefix=a/', '--dst-prefix=b/', rev, '--')
+    return parse_hunks(output)
+
+def parse_hunks(diff: bytes) -> Dict[str, List[Tuple[int, int]]]:
+    """Map each file in ``git diff -U0`` output to the new-side line ranges of its hunks"""
+    hunks: Dict[str, List[Tuple[int, int]]] = {}
+    # Split into per-file sections; each names its new path on a '+++ b/...' line
+    for section in diff.split(b'\ndiff --git '):
+        header_end = section.find(b'\n@@')
+        header = section if header_end < 0 else section[:header_end]
+        new_path = None
+        for line in header.split(b'\n'):
+            if line.startswith(b'+++ '):
+                new_path = _unquote_path(line[4:])
+        if new_path is None or not new_path.startswith('b/'):
+            continue
+        ranges = []
+        for match in _HUNK_HEADER.finditer(section):
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            # A count of zero is a pure deletion: no lines on the new side
+            if count:
+                ranges.append((start, start + count - 1))
+        hunks[new_path[2:]] = ranges
+    return hunks
+
+def _unquote_path(raw: bytes) -> str:
+    """Undo git's C-style quoting of unusual path names"""
+    raw = raw.rstrip(b'\t')
+    if raw.startswith(b'"') and raw.endswith(b'"'):
+        raw = raw[1:-1].decode('unicode_escape').encode('latin-1')
+    return os.fsdecode(raw)
+
+def resolve_tree_path(directory: str) -> Tuple[str, str]:
+    """(repository top level, '/'-separated path of ``directory`` inside it)"""
+    # ``directory`` need not exist on disk, as in a no-checkout clone; git runs
+    # from its nearest existing parent
+    target = os.path.abspath(directory)
+    existing = target
+    while not os.path.isdir(existing):
+        existing = os.path.dirname(existing)
+    top = os.fsdecode(run_git(existing, 'rev-parse', '--show-toplevel').rstrip(b'\n'))
+    inside = os.path.join(os.path.realpath(existing), os.path.relpath(target, existing))
+    path = os.path.relpath(os.path.normpath(inside), top).replace(os.sep, '/')
+    if path == '..' or path.startswith('../'):
+        raise GitError(f"'{directory}' is outside repository at '{top}'")
+    return top, '' if path == '.' else path
+
+def list_tree(top: str, treeish: str, path: str = '') -> List[Tuple[str, str]]:
+    """(path, blob id) of every regular file in ``treeish`` under ``path``, relative to it"""
+    args = ['ls-tree', '-r', '-z', treeish]
+    if path:
+        args += ['--', path]
+    output = run_git(top, *args)
+    prefix = path + '/' if path else ''
+    entries = []
+    for record in output.split(b'\0'):
+        if not record:
+            continue
+        meta, _, name = record.partition(b'\t')
+        mode, kind, oid = meta.split(b' ')
+        name = os.fsdecode(name)
+        # Skip symlinks (120000) and submodules, whose objects are not file contents
+        if kind == b'blob' and mode != b'120000' and name.startswith(prefix):
+            entries.append((name[len(prefix):], oid.decode('ascii')))
+    return entries
+
+def staged_files(directory: str) -> List[Tuple[str, str]]:
+    """(path, blob id) of every regular file staged under ``directory``, relative to it"""
+    # Compares the index against HEAD (or an empty tree before the first commit)
+    output = run_git(directory, 'diff', '--cached', '--raw', '-z', '--no-abbrev', '--no-renames',
+                     '--relative', '--diff-filter=d', '--no-ext-diff', '--')
+    # Records alternate ':<old mode> <new mode> <old id> <new id> <status>' and the path
+    fields = output.split(b'\0')
+    entries = []
+    for meta, path in zip(fields[0::2], fields[1::2]):
+        _, mode, _, oid, _ = meta.split(b' ')
+        if mode in (b'100644', b'100755'):
+            entries.append((os.fsdecode(path), oid.decode('ascii')))
+    return entries
+
+class BlobReader:
+    """Reads blob contents through one long-lived ``git cat-file --batch`` process"""
+    # Object ids are written from a helper thread while contents are read on the
+    # caller's, so neither side blocks on a full pipe
+
+    def __init__(self, directory: str):
+        try:
+            self.process = subprocess.Popen(['git', '-C', directory, 'cat-file', '--batch'],
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        except FileNotFoundError:
+            raise GitError("git executable not found")
+        self._writer: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read_blobs(self, oids: Iterable[str]) -> Iterator[bytes]:
+        """Yield the contents of each object in ``oids``, in order"""
+        oids = list(oids)
+        self._writer = threading.Thread(target=self._write_requests, args=(oids,), daemon=True)
+        self._writer.start()
+
+        stdout = self.process.stdout
+        for oid in oids:
+            header = stdout.readline()
+            fields = header.split()
+            if len(fields) != 3:
+                raise GitError(f"cannot read object {oid}: {header.decode('utf-8', 'replace').strip()}")
+            data = stdout.read(int(fields[2]))
+            stdout.read(1)    # trailing newline
+            yield data
+
+    def _write_requests(self, oids: List[str]):
+        stdin = self.process.stdin
+        try:
+            for oid in oids:
+                stdin.write(oid.encode('ascii') + b'\n')
+            stdin.close()
+        except (BrokenPipeError, ValueError):
+            # The reader stopped early and closed the process
+            pass
+
+    def close(self):
+        # Stopping git first unblocks a writer stuck on a full pipe after an early exit
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        if self._writer is not None:
+            self._writer.join()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+def filter_to_hunks(issues: List[CodeIssue], ranges: List[Tuple[int, int]]) -> List[CodeIssue]:
+    """Keep issues on lines inside ``ranges`` (sorted, non-overlapping), plus file-level ones"""
+    starts = [start for start, _ in ranges]
+    kept = []
+    for issue in issues:
+        if issue.issue_type in FILE_LEVEL_ISSUE_TYPES:
+            kept.append(issue)
+            continue
+        index = bisect_right(starts, issue.line) - 1
+        if index >= 0 and issue.line <= ranges[index][1]:
+            kept.append(issue)
+    return kept
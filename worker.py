@@ -0,0 +1,62 @@
+"""
+Worker process entry points for parallel analysis
+"""
+
+import os
+from multiprocessing import util
+from typing import Dict, List, Optional, Tuple
+from analyzer import CodeAnalyzer, CodeIssue
+from cache import ResultCache
+from config import AnalysisConfig
+from profiler import Profiler
+from stats import MetricColumns
+
+# One analyzer per worker process, built once by init_worker
+_analyzer: Optional[CodeAnalyzer] = None
+
+def init_worker(config_path: str, cache_dir: Optional[str] = None, cache_size_mb: Optional[float] = None,
+                profile: bool = False, stats: bool = False, config: Optional[AnalysisConfig] = None):
+    """Build this process's analyzer when the worker starts, from the parent's ``config`` if given"""
+    global _analyzer
+    cache = None
+    if cache_dir is not None:
+        cache = ResultCache(cache_dir, cache_size_mb)
+        # Pool workers exit without running atexit hooks; multiprocessing's
+        # own exit finalizers still run, so buffered writes get flushed there
+        util.Finalize(cache, cache.close, exitpriority=10)
+    _analyzer = CodeAnalyzer(config_path, cache=cache, profiler=Profiler() if profile else None,
+                             stats=MetricColumns() if stats else None, config=config)
+
+def analyze_path(file_path: str, content_hash: Optional[str] = None, data: Optional[bytes] = None) -> Tuple[List[CodeIssue], Optional[str], int, int, Optional[str], Optional[Dict], Optional[MetricColumns]]:
+    """Analyze one file (or ``data`` in its place) and return its outcome for the parent"""
+    # The outcome is (issues, content_hash, cache_hits, cache_misses, error,
+    # timings, metrics); errors are returned, since raising would abort the
+    # parent's ordered iteration
+    cache = _analyzer.cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    try:
+        if data is not None:
+            issues, digest = _analyzer.analyze_source(data, file_path, content_hash), None
+        else:
+            issues, digest = _analyzer.analyze_file_with_hash(file_path, content_hash)
+    except Exception as e:
+        return [], None, 0, 0, str(e), None, None
+    if cache is not None:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    timings = _analyzer.profiler.drain() if _analyzer.profiler is not None else None
+    metrics = _analyzer.stats.drain() if _analyzer.stats is not None else None
+    return issues, digest, hits, misses, None, timings, metrics
+
+def analyze_paths(items: List[Tuple[str, Optional[str], Optional[bytes]]]) -> List[Tuple[List[CodeIssue], Optional[str], int, int, Optional[str], Optional[Dict], Optional[MetricColumns]]]:
+    """Analyze a chunk of (file_path, content_hash, data) tasks, one round trip for all"""
+    return [analyze_path(file_path, content_hash, data) for file_path, content_hash, data in items]
+
+def analyze_source(data: bytes, filename: str, config: Optional[AnalysisConfig] = None) -> List[CodeIssue]:
+    """Analyze an in-memory upload in this worker, under ``config`` if given"""
+    if config is not None and config != _analyzer.config:
+        _analyzer.set_config(config)
+    return _analyzer.analyze_source(data, filename)
+
+def warm_up() -> int:
+    """No-op task used to start a worker and build its analyzer ahead of traffic"""
+    return os.getpid()
@@ -0,0 +1,384 @@
+"""
+Streaming writers for batch analysis summaries
+
+Each writer renders (file path, issues) pairs into a file object as they
+arrive, so a report of any size is produced with memory for one file's
+issues at a time.  Totals are only known once every file has been seen,
+so they are written last.
+"""
+
+import json
+from datetime import datetime
+from pathlib import PurePath
+from typing import Any, Callable, Dict, Iterable, List, TextIO, Tuple
+from urllib.parse import quote
+from analyzer import ANALYZER_VERSION, CodeIssue
+
+SEVERITY_ICONS = {'error': '❌', 'warning': '⚠️', 'info': 'ℹ️'}
+
+# Compact encoder for one-record-per-line output
+_encode_compact = json.JSONEncoder(separators=(',', ':')).encode
+
+def issue_record(issue: CodeIssue) -> Dict[str, Any]:
+    return {
+        'line': issue.line,
+        'type': issue.issue_type,
+        'message': issue.message,
+        'severity': issue.severity
+    }
+
+class SummaryWriter:
+    """Base class: begin(), then add() once per file, then finish() with run details"""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self.total_files = 0
+        self.total_issues = 0
+        self.files_with_issues = 0
+
+    def write(self, results: Iterable[Tuple[str, List[CodeIssue]]], details: Callable[[], Dict[str, Any]] = dict):
+        """Render every result, then the totals plus ``details()`` (timing, cache, ...)"""
+        self.begin()
+        for file_path, issues in results:
+            self.add(file_path, issues)
+        self.finish(details())
+
+    def begin(self):
+        pass
+
+    def add(self, file_path: str, issues: List[CodeIssue]):
+        self.total_files += 1
+        self.total_issues += len(issues)
+        if issues:
+            self.files_with_issues += 1
+        self.write_file(file_path, issues)
+
+    def write_file(self, file_path: str, issues: List[CodeIssue]):
+        raise NotImplementedError
+
+    def finish(self, details: Dict[str, Any]):
+        pass
+
+class TextSummaryWriter(SummaryWriter):
+    def begin(self):
+        self.out.write("AI Code Review - Batch Analysis Summary\n")
+        self.out.write("=" * 50 + "\n\n")
+
+    def write_file(self, file_path: str, issues: List[CodeIssue]):
+        if not issues:
+            return
+
+        lines = []
+        lines.append(f"📄 {file_path}")
+        lines.append(f"   Issues: {len(issues)}")
+
+        # Group by severity
+        severity_counts = {}
+        for issue in issues:
+            if issue.severity not in severity_counts:
+                severity_counts[issue.severity] = 0
+            severity_counts[issue.severity] += 1
+
+        severity_info = []
+        for severity in ['error', 'warning', 'info']:
+            if severity in severity_counts:
+                severity_info.append(f"{SEVERITY_ICONS[severity]} {severity_counts[severity]}")
+
+        if severity_info:
+            lines.append(f"   {' '.join(severity_info)}")
+        lines.append("")
+        self.out.write('\n'.join(lines) + '\n')
+
+    def finish(self, details: Dict[str, Any]):
+        lines = []
+        lines.append(f"Files analyzed: {self.total_files}")
+        lines.append(f"Total issues found: {self.total_issues}")
+        timing = details.get('timing')
+        if timing is not None:
+            lines.append(f"Wall time: {timing['wall_time']:.2f}s | CPU time: {timing['cpu_time']:.2f}s | "
+                         f"{timing['files_per_second']:.1f} files/s | Jobs: {timing['jobs']}")
+        cache = details.get('cache')
+        if cache is not None:
+            lines.append(f"Cache: {cache['hits']} hits, {cache['misses']} misses")
+        if self.files_with_issues:
+            lines.append(f"Files with issues: {self.files_with_issues}")
+        else:
+            lines.append("✅ No issues found in any files!")
+        self.out.write('\n'.join(lines) + '\n')
+
+class JsonSummaryWriter(SummaryWriter):
+    """Writes one indented JSON document: {"files": {...}, "analysis_summary": {...}}"""
+
+    def begin(self):
+        self.out.write('{\n  "files": {')
+
+    def write_file(self, file_path: str, issues: List[CodeIssue]):
+        entry = {
+            'issue_count': len(issues),
+            'issues': [issue_record(issue) for issue in issues]
+        }
+        separator = ',' if self.total_files > 1 else ''
+        # Nest the entry's own indentation two levels into the document
+        body = json.dumps(entry, indent=2).replace('\n', '\n    ')
+        self.out.write(f'{separator}\n    {json.dumps(file_path)}: {body}')
+
+    def finish(self, details: Dict[str, Any]):
+        summary = {
+            'total_files': self.total_files,
+            'total_issues': self.total_issues,
+            'generated_at': datetime.now().isoformat()
+        }
+        summary.update(details)
+        closing = '\n  }' if self.total_files else '}'
+        body = json.dumps(summary, indent=2).replace('\n', '\n  ')
+        self.out.write(f'{closing},\n  "analysis_summary": {body}\n}}\n')
+
+def write_ndjson_records(out: TextIO, file_path: str, issues: List[CodeIssue]):
+    """Write one compact JSON object per issue, one per line"""
+    if not issues:
+        return
+    out.write('\n'.join(_encode_compact({
+        'file': file_path,
+        'line': issue.line,
+        'type': issue.issue_type,
+        'message': issue.message,
+        'severity': issue.severity
+    }) for issue in issues) + '\n')
+
+class NdjsonSummaryWriter(SummaryWriter):
+    """JSON Lines: one record per issue and no totals, so shards concatenate cleanly"""
+
+    def write_file(self, file_path: str, issues: List[CodeIssue]):
+        write_ndjson_records(self.out, file_path, issues)
+
+def _script_json(value: Any) -> str:
+    """Compact JSON that is safe to embed in a <script> element"""
+    return _encode_compact(value).replace('<', '\\u003c')
+
+class HtmlSummaryWriter(SummaryWriter):
+    """Self-contained page with the issues embedded as JSON and paged client-side"""
+
+    def begin(self):
+        self.out.write(HTML_SUMMARY_HEAD)
+        self.out.write('<script type="application/json" id="report-files">[')
+
+    def write_file(self, file_path: str, issues: List[CodeIssue]):
+        if not issues:
+            return
+        entry = [file_path, [[issue.line, issue.issue_type, issue.severity, issue.message] for issue in issues]]
+        separator = ',' if self.files_with_issues > 1 else ''
+        self.out.write(separator + _script_json(entry))
+
+    def finish(self, details: Dict[str, Any]):
+        summary = {
+            'total_files': self.total_files,
+            'total_issues': self.total_issues,
+            'files_with_issues': self.files_with_issues,
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        summary.update(details)
+        self.out.write(']</script>\n<script type="application/json" id="report-summary">')
+        self.out.write(_script_json(summary))
+        self.out.write('</script>\n')
+        self.out.write(HTML_SUMMARY_TAIL)
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = {'error': 'error', 'warning': 'warning', 'info': 'note'}
+RULE_DESCRIPTIONS = {
+    'complexity': 'Function length, parameter count or nesting depth exceeds the configured limit',
+    'style': 'Line exceeds the configured maximum length',
+    'syntax': 'File could not be parsed',
+    'error': 'File could not be read or analyzed',
+}
+
+def _artifact_uri(file_path: str) -> str:
+    path = PurePath(file_path)
+    if path.is_absolute():
+        return path.as_uri()
+    return quote(path.as_posix())
+
+class SarifSummaryWriter(SummaryWriter):
+    """SARIF 2.1.0 log with a single run; rules are written after the results"""
+
+    def __init__(self, out: TextIO):
+        super().__init__(out)
+        self.rule_index: Dict[str, int] = {}
+
+    def begin(self):
+        self.out.write(f'{{"$schema":"{SARIF_SCHEMA}","version":"2.1.0","runs":[{{"results":[')
+
+    def write_file(self, file_path: str, issues: List[CodeIssue]):
+        if not issues:
+            return
+        artifact = {'uri': _artifact_uri(file_path)}
+        records = []
+        for issue in issues:
+            index = self.rule_index.setdefault(issue.issue_type, len(self.rule_index))
+            records.append(_encode_compact({
+                'ruleId': issue.issue_type,
+                'ruleIndex': index,
+                'level': SARIF_LEVELS.get(issue.severity, 'warning'),
+                'message': {'text': issue.message},
+                'locations': [{'physicalLocation': {
+                    'artifactLocation': artifact,
+                    'region': {'startLine': max(1, issue.line)},
+                }}],
+            }))
+        separator = ',' if self.total_issues > len(issues) else ''
+        self.out.write(separator + '\n' + ',\n'.join(records))
+
+    def finish(self, details: Dict[str, Any]):
+        rules = [{
+            'id': issue_type,
+            'shortDescription': {'text': RULE_DESCRIPTIONS.get(issue_type, issue_type)},
+        } for issue_type in self.rule_index]
+        driver = {
+            'name': 'AI Code Reviewer',
+            'version': ANALYZER_VERSION,
+            'rules': rules,
+        }
+        properties = {
+            'total_files': self.total_files,
+            'total_issues': self.total_issues,
+        }
+        properties.update(details)
+        self.out.write('\n],"tool":{"driver":' + _encode_compact(driver) +
+                       '},"properties":' + _encode_compact(properties) + '}]}\n')
+
+SUMMARY_WRITERS = {
+    'text': TextSummaryWriter,
+    'json': JsonSummaryWriter,
+    'ndjson': NdjsonSummaryWriter,
+    'html': HtmlSummaryWriter,
+    'sarif': SarifSummaryWriter,
+}
+
+HTML_STYLE = """        body { font-family: Arial, sans-serif; margin: 20px; }
+        .header { background-color: #f8f9fa; padding: 20px; border-radius: 5px; }
+        .summary { margin: 20px 0; }
+        .issue { margin: 10px 0; padding: 10px; border-left: 4px solid #ddd; }
+        .error { border-color: #dc3545; background-color: #f8d7da; }
+        .warning { border-color: #ffc107; background-color: #fff3cd; }
+        .info { border-color: #17a2b8; background-color: #d1ecf1; }
+        .severity { font-weight: bold; }
+        .line-num { color: #666; }
+"""
+
+HTML_SUMMARY_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>AI Code Review - Batch Analysis Summary</title>
+    <style>
+""" + HTML_STYLE + """        table { border-collapse: collapse; width: 100%; }
+        td, th { text-align: left; padding: 4px 8px; border-bottom: 1px solid #eee; }
+        td.issue { margin: 0; border-left-width: 4px; border-left-style: solid; }
+        .pager { margin: 10px 0; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>AI Code Review - Batch Analysis Summary</h1>
+        <div id="totals"></div>
+    </div>
+    <noscript><p>This report renders its issue list with JavaScript.</p></noscript>
+    <div class="summary">
+        <label>Severity
+            <select id="severity">
+                <option value="">All</option>
+                <option value="error">Error</option>
+                <option value="warning">Warning</option>
+                <option value="info">Info</option>
+            </select>
+        </label>
+        <label>Filter <input id="filter" placeholder="path or message"></label>
+    </div>
+    <div class="pager"><button id="prev">&laquo; Prev</button> <span id="page"></span> <button id="next">Next &raquo;</button></div>
+    <table>
+        <thead><tr><th>File</th><th>Line</th><th>Severity</th><th>Type</th><th>Message</th></tr></thead>
+        <tbody id="issues"></tbody>
+    </table>
+"""
+
+HTML_SUMMARY_TAIL = """<script>
+(function () {
+    var PAGE_SIZE = 200;
+    var files = JSON.parse(document.getElementById('report-files').textContent);
+    var summary = JSON.parse(document.getElementById('report-summary').textContent);
+
+    // Flatten to [file, line, type, severity, message] rows
+    var rows = [];
+    files.forEach(function (entry) {
+        entry[1].forEach(function (issue) {
+            rows.push([entry[0], issue[0], issue[1], issue[2], issue[3]]);
+        });
+    });
+
+    var totals = [
+        'Files analyzed: ' + summary.total_files,
+        'Total issues found: ' + summary.total_issues,
+        'Files with issues: ' + summary.files_with_issues,
+        'Generated: ' + summary.generated_at
+    ];
+    if (summary.timing) {
+        totals.push('Wall time: ' + summary.timing.wall_time + 's | CPU time: ' + summary.timing.cpu_time +
+                    's | ' + summary.timing.files_per_second + ' files/s | Jobs: ' + summary.timing.jobs);
+    }
+    if (summary.cache) {
+        totals.push('Cache: ' + summary.cache.hits + ' hits, ' + summary.cache.misses + ' misses');
+    }
+    var totalsNode = document.getElementById('totals');
+    totals.forEach(function (text) {
+        var p = document.createElement('p');
+        p.textContent = text;
+        totalsNode.appendChild(p);
+    });
+
+    var tbody = document.getElementById('issues');
+    var severity = document.getElementById('severity');
+    var filter = document.getElementById('filter');
+    var visible = rows;
+    var page = 0;
+
+    function applyFilter() {
+        var wanted = severity.value;
+        var needle = filter.value.toLowerCase();
+        visible = rows.filter(function (row) {
+            return (!wanted || row[3] === wanted) &&
+                (!needle || row[0].toLowerCase().indexOf(needle) >= 0 || row[4].toLowerCase().indexOf(needle) >= 0);
+        });
+        page = 0;
+        render();
+    }
+
+    function render() {
+        var pages = Math.max(1, Math.ceil(visible.length / PAGE_SIZE));
+        page = Math.min(Math.max(page, 0), pages - 1);
+        var fragment = document.createDocumentFragment();
+        visible.slice(page * PAGE_SIZE, (page + 1) * PAGE_SIZE).forEach(function (row) {
+            var tr = document.createElement('tr');
+            [row[0], row[1], row[3], row[2], row[4]].forEach(function (value, i) {
+                var td = document.createElement('td');
+                td.textContent = value;
+                if (i === 2) {
+                    td.className = 'issue ' + row[3];
+                }
+                tr.appendChild(td);
+            });
+            fragment.appendChild(tr);
+        });
+        tbody.replaceChildren(fragment);
+        document.getElementById('page').textContent =
+            'Page ' + (page + 1) + ' of ' + pages + ' (' + visible.length + ' issues)';
+    }
+
+    severity.addEventListener('change', applyFilter);
+    filter.addEventListener('input', applyFilter);
+    document.getElementById('prev').addEventListener('click', function () { page -= 1; render(); });
+    document.getElementById('next').addEventListener('click', function () { page += 1; render(); });
+    render();
+})();
+</script>
+</body>
+</html>
+"""